@@ -0,0 +1,248 @@
+"""
+Analysis Scaling Benchmark
+==========================
+
+Runs SchemaAnalyzer (analyze_extractions.py) and the extractor's relaxed
+mode check (ServicePdfExtractor._detect_type_issues) over synthetic corpora
+of growing size and reports, per corpus:
+
+- analysis time and time per document
+- peak memory (tracemalloc, measured in a second pass, so every subject
+  runs twice per size)
+- aggregation accuracy against the corpus ground truth: precision and
+  recall of findings per path/type, and how many distinct patterns the
+  analyzer reports compared to the true number of patterns
+
+Time growth between corpus sizes is reported as a scaling exponent
+(1.0 = linear); anything clearly above 1 is flagged as superlinear.
+
+Corpora are generated with synthetic_corpus.py on first use and reused
+while their manifest matches the seed, rate, source outputs and schema.
+Documents derived from the sample output take roughly 70 KB each, so sizes
+above 10,000 (7 GB at 100,000) must be enabled with --large.
+
+Usage:
+    python benchmark_analysis.py [--sizes 1000,10000] [--large] [--corpus-dir bench-corpus]
+                                 [--source output/] [--schema path] [--rate 0.2] [--seed 7]
+                                 [--report benchmark.json]
+"""
+
+import contextlib
+import gc
+import io
+import json
+import math
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from analyze_extractions import SchemaAnalyzer
+from common import option
+from load_test import load_templates
+from synthetic_corpus import CorpusGenerator, canonical_path, load_manifest, truth_key
+
+try:
+    from extract_services import ServicePdfExtractor
+except ImportError:  # the extractor needs anthropic, jsonschema and json_repair
+    ServicePdfExtractor = None
+
+
+# Time growth exponent above which a step is flagged as superlinear
+SUPERLINEAR_EXPONENT = 1.2
+
+# Shorter runs are too noisy to judge growth
+MIN_FLAG_SECONDS = 1.0
+
+# Corpora above this many documents take gigabytes of disk and need --large
+LARGE_CORPUS = 10000
+
+
+def run_schema_analyzer(corpus_dir: Path, schema_path: Path) -> Dict:
+    """Run SchemaAnalyzer.analyze_all and aggregate its findings by canonical path."""
+    analyzer = SchemaAnalyzer(corpus_dir, schema_path)
+    # The analyzer prints a line per file; keep console I/O out of the measurement
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer.analyze_all()
+
+    findings = defaultdict(int)
+    for issue in analyzer.issues:
+        findings[truth_key(canonical_path(issue['path']), issue['actual_type'])] += 1
+    return {"findings": dict(findings), "patterns": len(analyzer.issue_patterns)}
+
+
+def run_detect_type_issues(corpus_dir: Path, schema_path: Path) -> Dict:
+    """Run ServicePdfExtractor._detect_type_issues on every document, as relaxed mode does."""
+    extractor = ServicePdfExtractor("benchmark", str(schema_path), relaxed_mode=True)
+    findings = defaultdict(int)
+    patterns = set()
+    for json_file in sorted(corpus_dir.glob("*.json")):
+        with open(json_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for issue in extractor._detect_type_issues(data):
+            findings[truth_key(canonical_path(issue['path']), issue['actual_type'])] += 1
+            patterns.add(f"{issue['path']}:{issue['expected_type']}->{issue['actual_type']}")
+    return {"findings": dict(findings), "patterns": len(patterns)}
+
+
+def measure(subject: Callable, *args) -> Dict:
+    """
+    Run a subject twice: once for wall time, once under tracemalloc for peak memory.
+
+    Returns:
+        Dictionary with seconds, peakMb and the subject's result
+    """
+    gc.collect()
+    start = time.perf_counter()
+    result = subject(*args)
+    seconds = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        subject(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": seconds, "peakMb": peak / 1024 / 1024, "result": result}
+
+
+def score(findings: Dict[str, int], truth: Dict[str, int]) -> Dict:
+    """Precision and recall of aggregated findings against the ground truth."""
+    matched = sum(min(count, truth.get(key, 0)) for key, count in findings.items())
+    reported = sum(findings.values())
+    expected = sum(truth.values())
+    missed = {key: count - findings.get(key, 0) for key, count in truth.items() if findings.get(key, 0) < count}
+    spurious = {key: count - truth.get(key, 0) for key, count in findings.items() if count > truth.get(key, 0)}
+    return {
+        "reported": reported,
+        "expected": expected,
+        "precision": matched / reported if reported else 1.0,
+        "recall": matched / expected if expected else 1.0,
+        "missed": missed,
+        "spurious": spurious
+    }
+
+
+def scaling_exponent(previous: Dict, current: Dict) -> Optional[float]:
+    """Growth exponent of time between two corpus sizes (1.0 = linear)."""
+    if not previous or previous["seconds"] <= 0 or current["documents"] == previous["documents"]:
+        return None
+    return math.log(current["seconds"] / previous["seconds"]) / math.log(current["documents"] / previous["documents"])
+
+
+def ensure_corpus(count: int, corpus_root: Path, source: Path, schema: Dict,
+                  rate: float = 0.2, seed: int = 7) -> Dict:
+    """Reuse the corpus of this size if it was generated with the same settings, generate it otherwise."""
+    templates = load_templates(source) if source.exists() else []
+    if not templates:
+        raise Exception(f"No extracted outputs found in {source}")
+    generator = CorpusGenerator(templates, schema, rate=rate, seed=seed)
+
+    corpus_dir = corpus_root / str(count)
+    manifest = load_manifest(corpus_dir)
+    if generator.matches(manifest, count):
+        return manifest
+
+    if manifest:
+        print(f"🔄 Corpus in {corpus_dir} was generated with other settings, regenerating...")
+    print(f"🏭 Generating corpus of {count} document(s) in {corpus_dir}...")
+    return generator.generate(count, corpus_dir)
+
+
+def main():
+    """Main execution."""
+    script_dir = Path(__file__).parent
+    schema_path = Path(option('--schema', str(script_dir.parent.parent / "schemas" / "service-import-schema.json")))
+    source = Path(option('--source', str(script_dir / "output")))
+    corpus_root = Path(option('--corpus-dir', str(script_dir / "bench-corpus")))
+    sizes = [int(s) for s in option('--sizes', "1000,10000").split(",") if s.strip()]
+    rate = float(option('--rate', "0.2"))
+    seed = int(option('--seed', "7"))
+    report_path = option('--report')
+
+    large = [count for count in sizes if count > LARGE_CORPUS]
+    if large and '--large' not in sys.argv:
+        print(f"❌ Corpus size(s) {', '.join(map(str, large))} need about 70 KB of disk per document "
+              f"({max(large) * 70 / 1024 / 1024:.1f} GB for {max(large)}); pass --large to run them")
+        sys.exit(1)
+
+    if not schema_path.exists():
+        print(f"❌ Schema not found: {schema_path}")
+        sys.exit(1)
+    with open(schema_path, 'r', encoding='utf-8') as f:
+        schema = json.load(f)
+
+    subjects = {"SchemaAnalyzer": run_schema_analyzer}
+    if ServicePdfExtractor is not None:
+        subjects["_detect_type_issues"] = run_detect_type_issues
+    else:
+        print("ℹ️  Skipping _detect_type_issues: extractor dependencies not installed (pip install -r requirements.txt)")
+
+    results = defaultdict(list)
+
+    for count in sorted(sizes):
+        try:
+            manifest = ensure_corpus(count, corpus_root, source, schema, rate=rate, seed=seed)
+        except Exception as e:
+            print(f"❌ {str(e)}")
+            sys.exit(1)
+
+        for name, subject in subjects.items():
+            print(f"⏱️  {name} on {count} document(s)...")
+            measured = measure(subject, corpus_root / str(count), schema_path)
+            accuracy = score(measured["result"]["findings"], manifest["truth"])
+            results[name].append({
+                "documents": count,
+                "seconds": round(measured["seconds"], 3),
+                "msPerDocument": round(measured["seconds"] * 1000 / count, 3),
+                "peakMb": round(measured["peakMb"], 1),
+                "patternsReported": measured["result"]["patterns"],
+                "patternsExpected": len(manifest["truth"]),
+                **{k: (round(v, 4) if isinstance(v, float) else v) for k, v in accuracy.items()}
+            })
+
+    print()
+    print("=" * 80)
+    print("📊 ANALYSIS SCALING")
+    print("=" * 80)
+    for name, rows in results.items():
+        print(f"\n{name}")
+        print(f"   {'Docs':>8}{'Time s':>10}{'ms/doc':>9}{'Growth':>8}{'Peak MB':>10}"
+              f"{'Precision':>11}{'Recall':>8}{'Patterns':>10}")
+        previous = None
+        for row in rows:
+            exponent = scaling_exponent(previous, row)
+            row["scalingExponent"] = round(exponent, 2) if exponent is not None else None
+            growth = f"{exponent:.2f}" if exponent is not None else "-"
+            flag = ""
+            if exponent is not None and exponent > SUPERLINEAR_EXPONENT and previous["seconds"] >= MIN_FLAG_SECONDS:
+                flag = "  ⚠️ superlinear"
+            print(f"   {row['documents']:>8}{row['seconds']:>10.2f}{row['msPerDocument']:>9.2f}{growth:>8}"
+                  f"{row['peakMb']:>10.1f}{row['precision']:>11.1%}{row['recall']:>8.1%}"
+                  f"{row['patternsReported']:>5}/{row['patternsExpected']:<4}{flag}")
+            previous = row
+
+        last = rows[-1]
+        for label, entries in (("Missed", last["missed"]), ("Spurious", last["spurious"])):
+            if entries:
+                print(f"   {label} at {last['documents']} documents:")
+                for key, n in sorted(entries.items(), key=lambda item: -item[1])[:5]:
+                    print(f"      {n:>8}  {key}")
+    print("\n" + "=" * 80)
+    print(f"Growth: time scaling exponent vs. the previous size (1.00 = linear; "
+          f"flagged above {SUPERLINEAR_EXPONENT} once runs take {MIN_FLAG_SECONDS:.0f}s or more).")
+    print("Patterns: distinct patterns reported / true patterns (paths with array indices collapsed).")
+    print("Each subject runs twice per size: timed once, then again under tracemalloc for Peak MB.")
+
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump({"schema": str(schema_path), "passesPerSize": 2, "results": results}, f, indent=2)
+        print(f"💾 Report saved to: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
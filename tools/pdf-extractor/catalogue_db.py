@@ -0,0 +1,428 @@
+"""
+Queryable Service Catalogue Database
+====================================
+
+Flattens extracted JSON files into indexed SQLite tables (services, size
+options, effort breakdown, tools, roles, timeline phases) with an FTS5
+full-text index, so questions like "which services have L-size effort
+above 400 hours" or "which outputs mention Terraform" are answered
+without loading every file in output/.
+
+Ingest is incremental: files whose SHA-256 did not change are skipped.
+
+Usage:
+    python catalogue_db.py ingest [output_dir]
+    python catalogue_db.py search <text>
+    python catalogue_db.py effort <sizeCode> <minHours>
+    python catalogue_db.py query "<SQL>"          (read-only)
+
+Options:
+    --db <path>    Database file (default: output/catalogue.db)
+"""
+
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+
+SCHEMA_VERSION = 1
+
+# query_only still allows attaching (and so creating) other database files
+DENIED_QUERY_ACTIONS = {sqlite3.SQLITE_ATTACH, sqlite3.SQLITE_DETACH}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    fts_rowid INTEGER,
+    ingested_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS services (
+    file TEXT PRIMARY KEY REFERENCES files(file) ON DELETE CASCADE,
+    service_code TEXT,
+    service_name TEXT,
+    version TEXT,
+    category TEXT,
+    description TEXT,
+    notes TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_services_code ON services(service_code);
+CREATE INDEX IF NOT EXISTS ix_services_category ON services(category);
+
+CREATE TABLE IF NOT EXISTS size_options (
+    file TEXT NOT NULL REFERENCES files(file) ON DELETE CASCADE,
+    service_code TEXT,
+    size_code TEXT,
+    duration TEXT,
+    duration_days INTEGER,
+    hours REAL,
+    hours_min REAL,
+    hours_max REAL,
+    team_size TEXT,
+    complexity TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_size_options_file ON size_options(file);
+CREATE INDEX IF NOT EXISTS ix_size_options_size_hours
+    ON size_options(size_code, COALESCE(hours, hours_max, hours_min));
+
+CREATE TABLE IF NOT EXISTS effort_breakdown (
+    file TEXT NOT NULL REFERENCES files(file) ON DELETE CASCADE,
+    service_code TEXT,
+    size_code TEXT,
+    scope_area TEXT,
+    base_hours REAL,
+    notes TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_effort_breakdown_file ON effort_breakdown(file);
+CREATE INDEX IF NOT EXISTS ix_effort_breakdown_scope ON effort_breakdown(scope_area);
+
+CREATE TABLE IF NOT EXISTS tools (
+    file TEXT NOT NULL REFERENCES files(file) ON DELETE CASCADE,
+    service_code TEXT,
+    tool_group TEXT,
+    category TEXT,
+    tool_name TEXT COLLATE NOCASE,
+    version TEXT,
+    purpose TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_tools_file ON tools(file);
+CREATE INDEX IF NOT EXISTS ix_tools_name ON tools(tool_name);
+
+CREATE TABLE IF NOT EXISTS roles (
+    file TEXT NOT NULL REFERENCES files(file) ON DELETE CASCADE,
+    service_code TEXT,
+    role_name TEXT COLLATE NOCASE,
+    is_primary_owner INTEGER,
+    responsibilities TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_roles_file ON roles(file);
+CREATE INDEX IF NOT EXISTS ix_roles_name ON roles(role_name);
+
+CREATE TABLE IF NOT EXISTS timeline_phases (
+    file TEXT NOT NULL REFERENCES files(file) ON DELETE CASCADE,
+    service_code TEXT,
+    phase_number INTEGER,
+    phase_name TEXT,
+    description TEXT,
+    duration_small TEXT,
+    duration_medium TEXT,
+    duration_large TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_timeline_phases_file ON timeline_phases(file);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS service_fts USING fts5(
+    file UNINDEXED,
+    service_code UNINDEXED,
+    service_name,
+    description,
+    content,
+    tokenize = 'unicode61'
+);
+"""
+
+CHILD_TABLES = ["services", "size_options", "effort_breakdown", "tools", "roles", "timeline_phases"]
+
+
+def _number(value):
+    """Best-effort numeric value (extraction may return strings)."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(str(value).replace(",", "").strip())
+    except ValueError:
+        return None
+
+
+def _text(value) -> str:
+    """Flatten strings and string arrays into a single text value."""
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return "; ".join(str(v) for v in value if v is not None)
+    return str(value)
+
+
+def _collect_text(value, out: List[str]) -> None:
+    """Collect all string leaves of a document for the full-text index."""
+    if isinstance(value, str):
+        out.append(value)
+    elif isinstance(value, dict):
+        for nested in value.values():
+            _collect_text(nested, out)
+    elif isinstance(value, list):
+        for nested in value:
+            _collect_text(nested, out)
+
+
+class CatalogueDatabase:
+    """SQLite store of flattened service data with full-text search."""
+
+    def __init__(self, db_path: Path, read_only: bool = False):
+        """
+        Open (and create if needed) the catalogue database.
+
+        Args:
+            db_path: Path to the SQLite database file
+            read_only: Open an existing database read-only (search and queries)
+        """
+        self.db_path = Path(db_path)
+        self.read_only = read_only
+        if read_only:
+            self.conn = sqlite3.connect(f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True)
+        else:
+            self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        if not read_only:
+            self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self._ensure_schema()
+
+    def _ensure_schema(self) -> None:
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            raise Exception(f"Unsupported catalogue database version {version} in {self.db_path}")
+        if self.read_only:
+            return
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def ingest_directory(self, output_dir: Path) -> Tuple[int, int, int]:
+        """
+        Ingest all JSON files in a directory, skipping unchanged ones.
+
+        Returns:
+            Tuple of (ingested, unchanged, removed) file counts
+        """
+        known = {row["file"]: row["sha256"] for row in self.conn.execute("SELECT file, sha256 FROM files")}
+        present = {p.name: p for p in sorted(Path(output_dir).glob("*.json"))}
+        ingested = unchanged = 0
+
+        with self.conn:
+            for name in set(known) - set(present):
+                self._delete(name)
+
+            for name, path in present.items():
+                raw = path.read_bytes()
+                digest = hashlib.sha256(raw).hexdigest()
+                if known.get(name) == digest:
+                    unchanged += 1
+                    continue
+                # Drop the previous rows first, so a file that no longer parses leaves none behind
+                if name in known:
+                    self._delete(name)
+                try:
+                    data = json.loads(raw)
+                except ValueError as e:
+                    print(f"   ❌ Skipping {name}: {e}")
+                    continue
+                if not isinstance(data, dict) or not data.get("serviceCode"):
+                    continue
+                self._insert(name, digest, data)
+                ingested += 1
+
+        return ingested, unchanged, len(set(known) - set(present))
+
+    def _delete(self, file_name: str) -> None:
+        # FTS5 columns cannot be indexed, so the FTS row is deleted by rowid
+        row = self.conn.execute("SELECT fts_rowid FROM files WHERE file = ?", (file_name,)).fetchone()
+        if row and row["fts_rowid"] is not None:
+            self.conn.execute("DELETE FROM service_fts WHERE rowid = ?", (row["fts_rowid"],))
+        for table in CHILD_TABLES:
+            self.conn.execute(f"DELETE FROM {table} WHERE file = ?", (file_name,))
+        self.conn.execute("DELETE FROM files WHERE file = ?", (file_name,))
+
+    def _insert(self, file_name: str, digest: str, data: Dict) -> None:
+        code = data.get("serviceCode")
+        execute = self.conn.execute
+        executemany = self.conn.executemany
+
+        execute("INSERT INTO files (file, sha256, ingested_at) VALUES (?, ?, datetime('now'))", (file_name, digest))
+        execute(
+            "INSERT INTO services (file, service_code, service_name, version, category, description, notes) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (file_name, code, data.get("serviceName"), data.get("version"), data.get("category"),
+             _text(data.get("description")), _text(data.get("notes")))
+        )
+
+        size_rows, effort_rows = [], []
+        for option in data.get("sizeOptions") or []:
+            if not isinstance(option, dict):
+                continue
+            effort = option.get("effort") if isinstance(option.get("effort"), dict) else {}
+            size_code = option.get("sizeCode")
+            size_rows.append((
+                file_name, code, size_code, _text(option.get("duration")), _number(option.get("durationInDays")),
+                _number(effort.get("hours")), _number(effort.get("hoursMin")), _number(effort.get("hoursMax")),
+                _text(option.get("teamSize")), option.get("complexity")
+            ))
+            for item in option.get("effortBreakdown") or []:
+                if isinstance(item, dict):
+                    effort_rows.append((file_name, code, size_code, item.get("scopeArea"),
+                                        _number(item.get("baseHours")), _text(item.get("notes"))))
+        executemany("INSERT INTO size_options VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", size_rows)
+        executemany("INSERT INTO effort_breakdown VALUES (?, ?, ?, ?, ?, ?)", effort_rows)
+
+        tool_rows = []
+        tools_env = data.get("toolsAndEnvironment") if isinstance(data.get("toolsAndEnvironment"), dict) else {}
+        for group, items in tools_env.items():
+            for item in items if isinstance(items, list) else []:
+                if isinstance(item, dict):
+                    tool_rows.append((file_name, code, group, item.get("category"),
+                                      item.get("toolName") or _text(item.get("tools")),
+                                      _text(item.get("version")), _text(item.get("purpose") or item.get("capability"))))
+                else:
+                    tool_rows.append((file_name, code, group, None, _text(item), None, None))
+        executemany("INSERT INTO tools VALUES (?, ?, ?, ?, ?, ?, ?)", tool_rows)
+
+        role_rows = [
+            (file_name, code, role.get("roleName"), 1 if role.get("isPrimaryOwner") else 0,
+             _text(role.get("responsibilities")))
+            for role in data.get("responsibleRoles") or [] if isinstance(role, dict)
+        ]
+        executemany("INSERT INTO roles VALUES (?, ?, ?, ?, ?)", role_rows)
+
+        timeline = data.get("timeline")
+        phases = timeline.get("phases", []) if isinstance(timeline, dict) else timeline or []
+        phase_rows = []
+        for phase in phases:
+            if not isinstance(phase, dict):
+                continue
+            durations = phase.get("durationBySize") if isinstance(phase.get("durationBySize"), dict) else {}
+            phase_rows.append((file_name, code, _number(phase.get("phaseNumber")), phase.get("phaseName"),
+                               _text(phase.get("description")), _text(durations.get("small")),
+                               _text(durations.get("medium")), _text(durations.get("large"))))
+        executemany("INSERT INTO timeline_phases VALUES (?, ?, ?, ?, ?, ?, ?, ?)", phase_rows)
+
+        content: List[str] = []
+        _collect_text({k: v for k, v in data.items() if k not in ("serviceName", "description")}, content)
+        cursor = execute(
+            "INSERT INTO service_fts (file, service_code, service_name, description, content) VALUES (?, ?, ?, ?, ?)",
+            (file_name, code, data.get("serviceName"), _text(data.get("description")), "\n".join(content))
+        )
+        execute("UPDATE files SET fts_rowid = ? WHERE file = ?", (cursor.lastrowid, file_name))
+
+    def search(self, text: str, limit: int = 50) -> List[sqlite3.Row]:
+        """Full-text search over service names, descriptions and all other text."""
+        return self.conn.execute(
+            "SELECT service_code, service_name, file, "
+            "snippet(service_fts, -1, '[', ']', '…', 12) AS snippet "
+            "FROM service_fts WHERE service_fts MATCH ? ORDER BY rank LIMIT ?",
+            (self._fts_query(text), limit)
+        ).fetchall()
+
+    @staticmethod
+    def _fts_query(text: str) -> str:
+        """Quote plain search terms so punctuation does not break FTS syntax."""
+        if any(op in text for op in ('"', ' OR ', ' AND ', ' NOT ', '*', ':')):
+            return text
+        return " ".join('"' + term.replace('"', '""') + '"' for term in text.split())
+
+    def services_with_effort_above(self, size_code: str, min_hours: float) -> List[sqlite3.Row]:
+        """Services whose effort for a size exceeds a number of hours."""
+        return self.conn.execute(
+            "SELECT s.service_code, s.service_name, o.size_code, "
+            "COALESCE(o.hours, o.hours_max, o.hours_min) AS hours "
+            "FROM size_options o JOIN services s ON s.file = o.file "
+            "WHERE o.size_code = ? AND COALESCE(o.hours, o.hours_max, o.hours_min) > ? "
+            "ORDER BY hours DESC",
+            (size_code, min_hours)
+        ).fetchall()
+
+    def query(self, sql: str, params: Iterable = ()) -> List[sqlite3.Row]:
+        """Run an arbitrary read query; statements that would write or attach fail."""
+        self.conn.execute("PRAGMA query_only = ON")
+        self.conn.set_authorizer(
+            lambda action, *args: sqlite3.SQLITE_DENY if action in DENIED_QUERY_ACTIONS else sqlite3.SQLITE_OK)
+        try:
+            return self.conn.execute(sql, tuple(params)).fetchall()
+        finally:
+            self.conn.set_authorizer(None)
+            self.conn.execute("PRAGMA query_only = OFF")
+
+
+def _print_rows(rows: List[sqlite3.Row], elapsed_ms: float) -> None:
+    if rows:
+        columns = rows[0].keys()
+        print(" | ".join(columns))
+        print("-" * 80)
+        for row in rows:
+            print(" | ".join("" if row[c] is None else str(row[c]) for c in columns))
+    print(f"\n📊 {len(rows)} row(s) in {elapsed_ms:.1f} ms")
+
+
+def main():
+    """Main execution."""
+    script_dir = Path(__file__).parent
+    output_dir = script_dir / "output"
+    db_path = output_dir / "catalogue.db"
+
+    argv = sys.argv[1:]
+    if '--db' in argv:
+        position = argv.index('--db')
+        if position + 1 < len(argv):
+            db_path = Path(argv[position + 1])
+        del argv[position:position + 2]
+
+    if not argv or argv[0] not in ("ingest", "search", "effort", "query"):
+        print(__doc__)
+        sys.exit(1)
+
+    command, params = argv[0], argv[1:]
+
+    if command == "ingest" and params:
+        output_dir = Path(params[0])
+        if '--db' not in sys.argv:
+            db_path = output_dir / "catalogue.db"
+
+    if command == "ingest" and not output_dir.exists():
+        print(f"❌ Output directory not found: {output_dir}")
+        sys.exit(1)
+
+    if command != "ingest" and not db_path.exists():
+        print(f"❌ Database not found: {db_path}. Run: python catalogue_db.py ingest")
+        sys.exit(1)
+
+    db = CatalogueDatabase(db_path, read_only=command != "ingest")
+    started = time.perf_counter()
+
+    try:
+        if command == "ingest":
+            ingested, unchanged, removed = db.ingest_directory(output_dir)
+            elapsed = time.perf_counter() - started
+            print(f"✅ Ingested: {ingested}  Unchanged: {unchanged}  Removed: {removed}  ({elapsed:.2f} s)")
+            print(f"🗄️  Database: {db_path}")
+
+        elif command == "search":
+            rows = db.search(" ".join(params))
+            _print_rows(rows, (time.perf_counter() - started) * 1000)
+
+        elif command == "effort":
+            if len(params) != 2:
+                print("❌ Usage: python catalogue_db.py effort <sizeCode> <minHours>")
+                sys.exit(1)
+            rows = db.services_with_effort_above(params[0].upper(), float(params[1]))
+            _print_rows(rows, (time.perf_counter() - started) * 1000)
+
+        elif command == "query":
+            rows = db.query(" ".join(params))
+            _print_rows(rows, (time.perf_counter() - started) * 1000)
+
+    except sqlite3.Error as e:
+        print(f"❌ Query failed: {str(e)}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""
+Consolidated Service Catalogue Store
+====================================
+
+Stores all extracted services in a single NDJSON file (optionally
+zstd-compressed, one frame per record) plus an index mapping serviceCode
+and serviceName to byte offsets. A lookup or partial export reads one
+record instead of parsing every JSON file in output/.
+
+Usage:
+    python catalogue_store.py build [output_dir] [--zstd]
+    python catalogue_store.py lookup <serviceCode|serviceName> [--dir output_dir]
+    python catalogue_store.py export <serviceCode> [<serviceCode> ...] [--out file.json] [--dir output_dir]
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional dependency, only needed for --zstd
+    zstandard = None
+
+from common import atomic_write
+
+
+INDEX_VERSION = 1
+
+
+class CatalogueStore:
+    """Single-file service catalogue with a serviceCode/serviceName index."""
+
+    def __init__(self, directory: Path, compressed: bool = False, name: str = "catalogue"):
+        """
+        Initialize the catalogue store.
+
+        Args:
+            directory: Directory holding the catalogue and index files
+            compressed: Store records as zstd frames (requires 'zstandard')
+            name: Base name of the catalogue files
+        """
+        if compressed and zstandard is None:
+            raise Exception("zstd compression requires the 'zstandard' package (pip install zstandard)")
+
+        self.directory = Path(directory)
+        self.name = name
+        self.compressed = compressed
+        suffix = ".ndjson.zst" if compressed else ".ndjson"
+        self.data_path = self.directory / f"{name}{suffix}"
+        self.index_path = self.directory / f"{name}.idx"
+        self._index: Optional[Dict] = None
+
+    @classmethod
+    def open(cls, directory: Path, name: str = "catalogue") -> "CatalogueStore":
+        """Open an existing catalogue, detecting the format from its index."""
+        index_path = Path(directory) / f"{name}.idx"
+        compressed = False
+        if index_path.exists():
+            with open(index_path, 'r', encoding='utf-8') as f:
+                compressed = json.load(f).get("format") == "zstd"
+        return cls(directory, compressed=compressed, name=name)
+
+    def exists(self) -> bool:
+        """Check whether the catalogue files are present."""
+        return self.data_path.exists() and self.index_path.exists()
+
+    @property
+    def index(self) -> Dict:
+        """Loaded index (empty if the catalogue does not exist yet)."""
+        if self._index is None:
+            if self.index_path.exists():
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    self._index = json.load(f)
+            else:
+                self._index = {"records": {}, "names": {}}
+        return self._index
+
+    def service_codes(self) -> List[str]:
+        """List all service codes in the catalogue."""
+        return list(self.index["records"].keys())
+
+    def resolve(self, key: str) -> Optional[str]:
+        """Resolve a serviceCode or serviceName (case-insensitive) to a serviceCode."""
+        if key in self.index["records"]:
+            return key
+        return self.index["names"].get(key.strip().lower())
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Read a single service by serviceCode or serviceName."""
+        raw = self.get_raw(key)
+        return json.loads(raw) if raw is not None else None
+
+    def get_raw(self, key: str) -> Optional[bytes]:
+        """Read the uncompressed JSON bytes of a single service."""
+        code = self.resolve(key)
+        if code is None:
+            return None
+
+        entry = self.index["records"][code]
+        with open(self.data_path, 'rb') as f:
+            self._check_fresh(f)
+            f.seek(entry["offset"])
+            chunk = f.read(entry["length"])
+        return self._decode(chunk)
+
+    def iter_raw(self) -> Iterable[tuple]:
+        """Iterate (serviceCode, raw JSON bytes) for all records in file order."""
+        entries = sorted(self.index["records"].items(), key=lambda kv: kv[1]["offset"])
+        with open(self.data_path, 'rb') as f:
+            self._check_fresh(f)
+            for code, entry in entries:
+                f.seek(entry["offset"])
+                yield code, self._decode(f.read(entry["length"]))
+
+    def export(self, keys: Iterable[str], destination: Path) -> int:
+        """
+        Export selected services to a JSON array file (bulk import format).
+
+        Returns:
+            Number of exported services
+        """
+        records = [self.get_raw(k) for k in keys]
+        records = [r for r in records if r is not None]
+        atomic_write(Path(destination), b"[" + b",".join(records) + b"]")
+        return len(records)
+
+    def upsert(self, services: List[Dict], sources: Optional[List[Path]] = None,
+               rebuild: bool = False) -> List[Dict]:
+        """
+        Add or replace services and rewrite the catalogue atomically.
+
+        Unchanged records are copied as raw bytes without re-parsing; stored
+        records whose source file no longer exists are dropped.
+        Records are keyed by serviceCode only, so a code that repeats within
+        `services` from a different source file, or that is already stored
+        from a different source file that still exists, is refused instead of
+        replacing the other record. A repeat from the same file replaces it.
+
+        Args:
+            services: Extracted services
+            sources: Output file of each service (same order), recorded in the index
+            rebuild: Keep no stored records: the catalogue holds exactly `services`
+
+        Returns:
+            Refused collisions: dicts with serviceCode, source and conflictsWith
+        """
+        existing = CatalogueStore.open(self.directory, name=self.name)
+        stored = existing.index["records"] if existing.exists() and not rebuild else {}
+
+        updated = {}
+        collisions = []
+        for position, service in enumerate(services):
+            code = service.get("serviceCode")
+            if not code:
+                continue
+            source = str(Path(sources[position]).resolve()) if sources else None
+
+            if code in updated:
+                conflict = updated[code][2]
+                if conflict and conflict == source:
+                    conflict = None  # the same file again in this batch: the later version wins
+            else:
+                conflict = stored.get(code, {}).get("source")
+                if conflict and (conflict == source or not source or not Path(conflict).exists()):
+                    conflict = None  # same file again, or the old file is gone
+            if conflict or (code in updated and not source):
+                collisions.append({"serviceCode": code, "source": source, "conflictsWith": conflict})
+                continue
+
+            updated[code] = (service.get("serviceName", ""), self._encode_json(service), source)
+
+        # The existing catalogue may use the other format (plain vs zstd)
+        records = []
+        if stored:
+            for code, raw in existing.iter_raw():
+                entry = stored[code]
+                if code in updated or (entry.get("source") and not Path(entry["source"]).exists()):
+                    continue
+                records.append((code, entry.get("serviceName", ""), raw, entry.get("source")))
+        records.extend((code, name, raw, source) for code, (name, raw, source) in updated.items())
+
+        self._write(records)
+
+        if existing.data_path != self.data_path and existing.data_path.exists():
+            existing.data_path.unlink()
+
+        return collisions
+
+    def _write(self, records: List[tuple]) -> None:
+        """Write data file and index (data first, so the index never points past it)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        buffer = bytearray()
+        index = {
+            "version": INDEX_VERSION,
+            "format": "zstd" if self.compressed else "ndjson",
+            "dataFile": self.data_path.name,
+            "records": {},
+            "names": {}
+        }
+
+        for code, name, raw, source in records:
+            chunk = self._compress(raw)
+            index["records"][code] = {
+                "offset": len(buffer),
+                "length": len(chunk),
+                "serviceName": name
+            }
+            if source:
+                index["records"][code]["source"] = source
+            if name:
+                index["names"][name.strip().lower()] = code
+            buffer += chunk
+            if not self.compressed:
+                buffer += b"\n"
+
+        index["dataSize"] = len(buffer)
+
+        atomic_write(self.data_path, bytes(buffer))
+        atomic_write(self.index_path, json.dumps(index, indent=2, ensure_ascii=False).encode('utf-8'))
+        self._index = index
+
+    def _check_fresh(self, f) -> None:
+        """Guard against an index that does not belong to the data file."""
+        expected = self.index.get("dataSize")
+        if expected is not None and os.fstat(f.fileno()).st_size != expected:
+            raise Exception(f"Catalogue index is out of date for {self.data_path.name}; run 'build' again")
+
+    @staticmethod
+    def _encode_json(service: Dict) -> bytes:
+        return json.dumps(service, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def _compress(self, raw: bytes) -> bytes:
+        if not self.compressed:
+            return raw
+        return zstandard.ZstdCompressor(level=10).compress(raw)
+
+    def _decode(self, chunk: bytes) -> bytes:
+        if not self.compressed:
+            return chunk
+        return zstandard.ZstdDecompressor().decompress(chunk)
+
+
+def print_collisions(collisions: List[Dict]) -> None:
+    """Warn about services refused because their serviceCode is already taken."""
+    if not collisions:
+        return
+    print(f"⚠️  {len(collisions)} service(s) not stored: serviceCode already taken by another file")
+    for collision in collisions:
+        source = Path(collision["source"]).name if collision["source"] else "?"
+        print(f"   {collision['serviceCode']}: {source} collides with {collision['conflictsWith']}")
+
+
+def main():
+    """Main execution."""
+    script_dir = Path(__file__).parent
+    output_dir = script_dir / "output"
+
+    argv = sys.argv[1:]
+    options = {}
+    for flag in ('--dir', '--out'):
+        if flag in argv:
+            position = argv.index(flag)
+            options[flag] = argv[position + 1] if position + 1 < len(argv) else ""
+            del argv[position:position + 2]
+    if '--dir' in options:
+        output_dir = Path(options['--dir'])
+
+    args = [a for a in argv if not a.startswith('--')]
+    if not args or args[0] not in ("build", "lookup", "export"):
+        print(__doc__)
+        sys.exit(1)
+
+    command, params = args[0], args[1:]
+
+    if command == "build":
+        source_dir = Path(params[0]) if params else output_dir
+        json_files = sorted(source_dir.glob("*.json"))
+        services = []
+        sources = []
+        for json_file in json_files:
+            try:
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"   ❌ Skipping {json_file.name}: {e}")
+                continue
+            if isinstance(data, dict) and data.get("serviceCode"):
+                services.append(data)
+                sources.append(json_file)
+
+        try:
+            store = CatalogueStore(source_dir, compressed='--zstd' in sys.argv)
+            # Built from the directory as it is now: services of deleted files are dropped
+            collisions = store.upsert(services, sources, rebuild=True)
+        except Exception as e:
+            print(f"❌ Failed to build catalogue: {str(e)}")
+            sys.exit(1)
+        print_collisions(collisions)
+        print(f"✅ Catalogue built: {len(services) - len(collisions)} service(s) → {store.data_path}")
+        print(f"📇 Index: {store.index_path}")
+        return
+
+    store = CatalogueStore.open(output_dir)
+    if not store.exists():
+        print(f"❌ Catalogue not found in {output_dir}. Run: python catalogue_store.py build")
+        sys.exit(1)
+
+    if command == "lookup":
+        if not params:
+            print("❌ Usage: python catalogue_store.py lookup <serviceCode|serviceName>")
+            sys.exit(1)
+        service = store.get(" ".join(params))
+        if service is None:
+            print(f"❌ Service not found: {' '.join(params)}")
+            sys.exit(1)
+        print(json.dumps(service, indent=2, ensure_ascii=False))
+
+    elif command == "export":
+        destination = Path(options.get('--out') or "export.json")
+        count = store.export(params, destination)
+        print(f"✅ Exported {count} service(s) to {destination}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Shared Helpers
+==============
+
+Small helpers used by several of the extractor's tools.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """
+    Write a file atomically (temp file in the same directory + rename).
+
+    Readers see either the old or the new content, never a partial write.
+    """
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates 0600 files; keep the mode of the file being replaced
+        os.chmod(tmp_name, path.stat().st_mode & 0o777 if path.exists() else 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def option(name: str, default: Optional[str] = None) -> Optional[str]:
+    """Value following a command-line option (e.g. --report file.json), or the default."""
+    if name in sys.argv:
+        position = sys.argv.index(name)
+        if position + 1 < len(sys.argv):
+            return sys.argv[position + 1]
+    return default
@@ -0,0 +1,410 @@
+"""
+Cross-Service Dependency Index
+==============================
+
+Builds an index over all extracted outputs that resolves dependency
+references (prerequisite, triggersFor, parallelWith) from serviceName to
+serviceCode, flags dangling references and detects dependency cycles.
+A serviceCode found in several files, or a serviceName used by several
+codes, is reported instead of silently collapsed: the first file (by
+name) owns a repeated code, and references to an ambiguous name are
+left unresolved.
+
+The index is cached per file (size + mtime), so a rebuild only re-reads
+outputs that changed. The exported mapping can be sent along with bulk
+imports, or applied to the outputs with --apply so that every dependency
+already carries its resolved serviceCode.
+
+Usage:
+    python dependency_index.py [output_dir] [--export dependency-map.json] [--apply]
+"""
+
+import json
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from common import atomic_write
+
+
+DEPENDENCY_TYPES = ["prerequisite", "triggersFor", "parallelWith"]
+
+CACHE_FILE = ".dependency-index"
+CACHE_VERSION = 1
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a service name for matching (case and whitespace insensitive)."""
+    return re.sub(r"\s+", " ", name or "").strip().lower()
+
+
+class DependencyIndex:
+    """Index of services and their dependency references across output files."""
+
+    def __init__(self, output_dir: Path):
+        """
+        Initialize the index.
+
+        Args:
+            output_dir: Directory containing extracted JSON files
+        """
+        self.output_dir = Path(output_dir)
+        self.cache_path = self.output_dir / CACHE_FILE
+        self.entries: Dict[str, Dict] = {}
+        self._load_cache()
+
+    def _load_cache(self) -> None:
+        if not self.cache_path.exists():
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get("version") == CACHE_VERSION:
+                self.entries = cache.get("files", {})
+        except Exception:
+            self.entries = {}
+
+    def save(self) -> None:
+        """Persist the per-file cache."""
+        cache = {"version": CACHE_VERSION, "files": self.entries}
+        atomic_write(self.cache_path, json.dumps(cache, ensure_ascii=False).encode('utf-8'))
+
+    def rebuild(self) -> int:
+        """
+        Bring the index up to date with the output directory.
+
+        Returns:
+            Number of files that were (re)parsed
+        """
+        present = {p.name: p for p in self.output_dir.glob("*.json")}
+
+        for name in list(self.entries):
+            if name not in present:
+                del self.entries[name]
+
+        parsed = 0
+        for name, path in sorted(present.items()):
+            if self.update_file(path):
+                parsed += 1
+        return parsed
+
+    def update_file(self, path: Path) -> bool:
+        """
+        Re-index a single output file if it changed since the last build.
+
+        Returns:
+            True if the file was parsed, False if the cached entry was reused
+        """
+        path = Path(path)
+        if not path.exists():
+            self.entries.pop(path.name, None)
+            return False
+
+        stat = path.stat()
+        cached = self.entries.get(path.name)
+        if cached and cached["mtime"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+            return False
+
+        entry = {"mtime": stat.st_mtime_ns, "size": stat.st_size, "serviceCode": None, "serviceName": None, "refs": []}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception:
+            data = None
+
+        if isinstance(data, dict) and data.get("serviceCode"):
+            entry["serviceCode"] = data["serviceCode"]
+            entry["serviceName"] = data.get("serviceName")
+            dependencies = data.get("dependencies") or {}
+            for dep_type in DEPENDENCY_TYPES:
+                for ref in dependencies.get(dep_type) or []:
+                    if isinstance(ref, dict):
+                        entry["refs"].append({
+                            "type": dep_type,
+                            "serviceName": ref.get("serviceName"),
+                            "serviceCode": ref.get("serviceCode"),
+                            "requirementLevel": ref.get("requirementLevel")
+                        })
+
+        self.entries[path.name] = entry
+        return True
+
+    def owners(self) -> Dict[str, str]:
+        """Map serviceCode -> file it is indexed from (the first file by name if repeated)."""
+        owners = {}
+        for file_name, entry in sorted(self.entries.items()):
+            if entry["serviceCode"] and entry["serviceCode"] not in owners:
+                owners[entry["serviceCode"]] = file_name
+        return owners
+
+    def services(self) -> Dict[str, str]:
+        """Map serviceCode -> serviceName for all indexed services."""
+        return {code: self.entries[file_name]["serviceName"] for code, file_name in self.owners().items()}
+
+    def duplicates(self) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Find serviceCodes and serviceNames that do not identify a single service.
+
+        Returns:
+            Dictionary with 'codes' (serviceCode -> files) and 'names'
+            (normalized serviceName -> serviceCodes)
+        """
+        files = defaultdict(list)
+        codes_by_name = defaultdict(set)
+        for file_name, entry in sorted(self.entries.items()):
+            if not entry["serviceCode"]:
+                continue
+            files[entry["serviceCode"]].append(file_name)
+            if entry["serviceName"]:
+                codes_by_name[normalize_name(entry["serviceName"])].add(entry["serviceCode"])
+        return {
+            "codes": {code: names for code, names in files.items() if len(names) > 1},
+            "names": {name: sorted(codes) for name, codes in codes_by_name.items() if len(codes) > 1}
+        }
+
+    def name_index(self) -> Dict[str, str]:
+        """Map normalized serviceName -> serviceCode (names used by several codes are left out)."""
+        ambiguous = self.duplicates()["names"]
+        return {normalize_name(name): code for code, name in self.services().items()
+                if name and normalize_name(name) not in ambiguous}
+
+    def resolve(self, ref: Dict, codes: Dict[str, str] = None, names: Dict[str, str] = None) -> Optional[str]:
+        """Resolve a dependency reference to a known serviceCode."""
+        codes = codes if codes is not None else self.services()
+        names = names if names is not None else self.name_index()
+        if ref.get("serviceCode") in codes:
+            return ref["serviceCode"]
+        return names.get(normalize_name(ref.get("serviceName")))
+
+    def analyze(self) -> Dict:
+        """
+        Resolve all references and detect problems.
+
+        Returns:
+            Dictionary with 'dependencies', 'dangling', 'ambiguous', 'mismatches',
+            'duplicates' and 'cycles'
+        """
+        codes = self.services()
+        names = self.name_index()
+        owners = self.owners()
+        duplicates = self.duplicates()
+        dependencies: Dict[str, List[Dict]] = {}
+        dangling = []
+        ambiguous = []
+        mismatches = []
+
+        for file_name, entry in sorted(self.entries.items()):
+            source = entry["serviceCode"]
+            # A repeated code keeps the references of its owner only; the others are reported as duplicates
+            if not source or owners[source] != file_name:
+                continue
+            resolved_refs = dependencies.setdefault(source, [])
+            for ref in entry["refs"]:
+                resolved = self.resolve(ref, codes, names)
+                by_name = names.get(normalize_name(ref.get("serviceName")))
+                if ref.get("serviceCode") and by_name and by_name != ref["serviceCode"]:
+                    mismatches.append({"service": source, "file": file_name, **ref, "resolvedByName": by_name})
+                if resolved is None and normalize_name(ref.get("serviceName")) in duplicates["names"]:
+                    ambiguous.append({"service": source, "file": file_name, **ref})
+                elif resolved is None:
+                    dangling.append({"service": source, "file": file_name, **ref})
+                resolved_refs.append({**ref, "resolvedCode": resolved})
+
+        return {
+            "dependencies": dependencies,
+            "dangling": dangling,
+            "ambiguous": ambiguous,
+            "mismatches": mismatches,
+            "duplicates": duplicates,
+            "cycles": self._find_cycles(dependencies)
+        }
+
+    @staticmethod
+    def _find_cycles(dependencies: Dict[str, List[Dict]]) -> List[List[str]]:
+        """
+        Find cycles in the 'must come before' relation (Tarjan's SCC, iterative).
+
+        A prerequisite B of A means A depends on B; A triggersFor B means
+        B depends on A. parallelWith does not impose an order.
+        """
+        graph: Dict[str, set] = {code: set() for code in dependencies}
+        for source, refs in dependencies.items():
+            for ref in refs:
+                target = ref["resolvedCode"]
+                if target is None:
+                    continue
+                if ref["type"] == "prerequisite":
+                    graph.setdefault(source, set()).add(target)
+                elif ref["type"] == "triggersFor":
+                    graph.setdefault(target, set()).add(source)
+
+        index_of: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack = set()
+        stack: List[str] = []
+        cycles = []
+        counter = 0
+
+        for root in sorted(graph):
+            if root in index_of:
+                continue
+            work = [(root, iter(sorted(graph[root])))]
+            index_of[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+
+            while work:
+                node, children = work[-1]
+                advanced = False
+                for child in children:
+                    if child not in index_of:
+                        index_of[child] = lowlink[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(sorted(graph.get(child, ())))))
+                        advanced = True
+                        break
+                    if child in on_stack:
+                        lowlink[node] = min(lowlink[node], index_of[child])
+                if advanced:
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in graph.get(node, ()):
+                        cycles.append(sorted(component))
+
+        return cycles
+
+    def export_mapping(self, analysis: Dict) -> Dict:
+        """Build the precomputed mapping sent with bulk imports."""
+        ambiguous = analysis["duplicates"]["names"]
+        return {
+            "services": self.services(),
+            "names": {name: code for code, name in self.services().items()
+                      if name and normalize_name(name) not in ambiguous},
+            "dependencies": analysis["dependencies"],
+            "dangling": analysis["dangling"],
+            "ambiguous": analysis["ambiguous"],
+            "duplicates": analysis["duplicates"],
+            "cycles": analysis["cycles"]
+        }
+
+    def apply(self) -> int:
+        """
+        Write resolved serviceCodes into the dependency references of the outputs.
+
+        Returns:
+            Number of files updated
+        """
+        codes = self.services()
+        names = self.name_index()
+        updated = 0
+
+        for file_name, entry in sorted(self.entries.items()):
+            if not entry["serviceCode"]:
+                continue
+            path = self.output_dir / file_name
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            changed = False
+            dependencies = data.get("dependencies") or {}
+            for dep_type in DEPENDENCY_TYPES:
+                for ref in dependencies.get(dep_type) or []:
+                    if not isinstance(ref, dict) or ref.get("serviceCode") in codes:
+                        continue
+                    resolved = self.resolve(ref, codes, names)
+                    if resolved:
+                        ref["serviceCode"] = resolved
+                        changed = True
+
+            if changed:
+                atomic_write(path, json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8'))
+                self.update_file(path)
+                updated += 1
+
+        return updated
+
+
+def main():
+    """Main execution."""
+    script_dir = Path(__file__).parent
+    output_dir = script_dir / "output"
+
+    export_path = None
+    if '--export' in sys.argv:
+        position = sys.argv.index('--export')
+        export_path = Path(sys.argv[position + 1]) if position + 1 < len(sys.argv) else Path("dependency-map.json")
+
+    args = [a for a in sys.argv[1:] if not a.startswith('--') and Path(a) != export_path]
+    if args:
+        output_dir = Path(args[0])
+
+    if not output_dir.exists():
+        print(f"❌ Output directory not found: {output_dir}")
+        sys.exit(1)
+
+    index = DependencyIndex(output_dir)
+    parsed = index.rebuild()
+    print(f"🔗 Indexed {len(index.services())} service(s) ({parsed} file(s) re-read)")
+
+    if '--apply' in sys.argv:
+        updated = index.apply()
+        print(f"✏️  Resolved serviceCodes written to {updated} file(s)")
+
+    index.save()
+    analysis = index.analyze()
+
+    total_refs = sum(len(refs) for refs in analysis["dependencies"].values())
+    print("=" * 80)
+    print(f"📊 References: {total_refs}")
+    print(f"❓ Dangling: {len(analysis['dangling'])}")
+    for ref in analysis["dangling"]:
+        print(f"   {ref['service']} → {ref['type']}: {ref['serviceName']} ({ref['serviceCode'] or 'no code'})")
+
+    duplicates = analysis["duplicates"]
+    if duplicates["codes"] or duplicates["names"]:
+        print(f"⚠️  Duplicates: {len(duplicates['codes'])} serviceCode(s), {len(duplicates['names'])} serviceName(s)")
+        for code, files in duplicates["codes"].items():
+            print(f"   {code} in {', '.join(files)} (using {files[0]})")
+        for name, codes in duplicates["names"].items():
+            print(f"   '{name}' used by {', '.join(codes)}")
+    if analysis["ambiguous"]:
+        print(f"❔ Ambiguous (name used by several codes): {len(analysis['ambiguous'])}")
+        for ref in analysis["ambiguous"]:
+            print(f"   {ref['service']} → {ref['type']}: {ref['serviceName']}")
+
+    if analysis["mismatches"]:
+        print(f"⚠️  Code/name mismatches: {len(analysis['mismatches'])}")
+        for ref in analysis["mismatches"]:
+            print(f"   {ref['service']} → {ref['serviceName']}: "
+                  f"code {ref['serviceCode']}, name resolves to {ref['resolvedByName']}")
+
+    print(f"🔁 Cycles: {len(analysis['cycles'])}")
+    for cycle in analysis["cycles"]:
+        print(f"   {' ↔ '.join(cycle)}")
+    print("=" * 80)
+
+    if export_path:
+        atomic_write(export_path, json.dumps(index.export_mapping(analysis), indent=2, ensure_ascii=False).encode('utf-8'))
+        print(f"💾 Dependency mapping saved to: {export_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""
+Extraction Diff and Delta Import
+================================
+
+Compares each extracted JSON with the version last imported for the same
+serviceCode and produces a compact, path-aware change set. Array items are
+matched by natural keys (scenarioNumber, sizeCode, phaseNumber, ...), so a
+reordered or inserted item does not show up as a change to every element.
+
+Only new services that are not in the baseline yet are uploaded to the
+bulk import endpoint; after a successful upload they become the new
+baseline (output/imported.ndjson, see catalogue_store.py). The endpoint
+only creates services, so changed services that were imported before are
+listed as needing an update instead of being posted.
+
+Usage:
+    python diff_extractions.py [output_dir] [--changes changes.json]
+    python diff_extractions.py [output_dir] --upload http://localhost:7071/api [--batch-size 20]
+    python diff_extractions.py [output_dir] --mark-imported
+"""
+
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from catalogue_store import CatalogueStore
+from common import atomic_write, option
+
+
+# Natural keys for matching array items, in order of preference.
+# The first key present and unique across all items of an array is used.
+NATURAL_KEYS = [
+    "scenarioNumber",
+    "sizeCode",
+    "phaseNumber",
+    "categoryNumber",
+    "serviceCode",
+    "serviceName",
+    "parameterName",
+    "roleName",
+    "role",
+    "toolName",
+    "licenseName",
+    "requirementType",
+    "criteriaName",
+    "scopeArea",
+    "factor",
+    "exampleName",
+    "considerationTitle",
+    "itemName",
+    "categoryName",
+    "name",
+]
+
+BASELINE_NAME = "imported"
+
+
+class ExtractionDiffer:
+    """Computes structural change sets between two extractions of a service."""
+
+    def __init__(self, natural_keys: List[str] = None):
+        """
+        Initialize the differ.
+
+        Args:
+            natural_keys: Keys used to match array items (defaults to NATURAL_KEYS)
+        """
+        self.natural_keys = natural_keys or NATURAL_KEYS
+
+    def diff(self, old, new) -> List[Dict]:
+        """
+        Compare two documents.
+
+        Args:
+            old: Previously imported document (None if the service is new)
+            new: Newly extracted document
+
+        Returns:
+            List of changes with 'op' (add/remove/change), 'path' and values
+        """
+        changes: List[Dict] = []
+        if old is None:
+            changes.append({'op': 'add', 'path': '', 'new': new.get('serviceCode') if isinstance(new, dict) else None})
+            return changes
+        self._diff(old, new, "", changes)
+        return changes
+
+    def _diff(self, old, new, path: str, changes: List[Dict]) -> None:
+        if isinstance(old, dict) and isinstance(new, dict):
+            for key in list(old) + [k for k in new if k not in old]:
+                child_path = f"{path}.{key}" if path else key
+                if key not in new:
+                    changes.append({'op': 'remove', 'path': child_path, 'old': old[key]})
+                elif key not in old:
+                    changes.append({'op': 'add', 'path': child_path, 'new': new[key]})
+                else:
+                    self._diff(old[key], new[key], child_path, changes)
+
+        elif isinstance(old, list) and isinstance(new, list):
+            key = self._natural_key(old, new)
+            if key is None:
+                self._diff_by_position(old, new, path, changes)
+            else:
+                self._diff_by_key(old, new, key, path, changes)
+
+        elif old != new or (type(old) is not type(new) and not self._same_number(old, new)):
+            changes.append({'op': 'change', 'path': path, 'old': old, 'new': new})
+
+    @staticmethod
+    def _same_number(old, new) -> bool:
+        numeric = (int, float)
+        return (isinstance(old, numeric) and isinstance(new, numeric)
+                and not isinstance(old, bool) and not isinstance(new, bool) and old == new)
+
+    def _natural_key(self, old: List, new: List) -> Optional[str]:
+        """Find a key that identifies items in both arrays."""
+        items = old + new
+        if not items or not all(isinstance(item, dict) for item in items):
+            return None
+
+        for key in self.natural_keys:
+            if not all(key in item for item in items):
+                continue
+            old_values = [self._hashable(item[key]) for item in old]
+            new_values = [self._hashable(item[key]) for item in new]
+            if len(set(old_values)) == len(old_values) and len(set(new_values)) == len(new_values):
+                return key
+        return None
+
+    @staticmethod
+    def _hashable(value):
+        return json.dumps(value, sort_keys=True) if isinstance(value, (dict, list)) else value
+
+    def _diff_by_key(self, old: List, new: List, key: str, path: str, changes: List[Dict]) -> None:
+        old_items = {self._hashable(item[key]): item for item in old}
+        new_items = {self._hashable(item[key]): item for item in new}
+
+        for value, item in old_items.items():
+            if value not in new_items:
+                changes.append({'op': 'remove', 'path': f"{path}[{key}={value}]", 'old': item})
+
+        for value, item in new_items.items():
+            item_path = f"{path}[{key}={value}]"
+            if value not in old_items:
+                changes.append({'op': 'add', 'path': item_path, 'new': item})
+            else:
+                self._diff(old_items[value], item, item_path, changes)
+
+    def _diff_by_position(self, old: List, new: List, path: str, changes: List[Dict]) -> None:
+        # Scalar arrays (outOfScope, deliverables, ...) behave like sets with order;
+        # report them as one change instead of shifting every index
+        if not any(isinstance(item, (dict, list)) for item in old + new):
+            if old != new:
+                changes.append({'op': 'change', 'path': path, 'old': old, 'new': new})
+            return
+
+        for i in range(max(len(old), len(new))):
+            item_path = f"{path}[{i}]"
+            if i >= len(new):
+                changes.append({'op': 'remove', 'path': item_path, 'old': old[i]})
+            elif i >= len(old):
+                changes.append({'op': 'add', 'path': item_path, 'new': new[i]})
+            else:
+                self._diff(old[i], new[i], item_path, changes)
+
+
+def load_outputs(output_dir: Path) -> Dict[str, Dict]:
+    """Load extracted outputs keyed by serviceCode."""
+    services = {}
+    for json_file in sorted(output_dir.glob("*.json")):
+        try:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"   ❌ Skipping {json_file.name}: {e}")
+            continue
+        if isinstance(data, dict) and data.get("serviceCode"):
+            if data["serviceCode"] in services:
+                print(f"   ⚠️  Skipping {json_file.name}: serviceCode {data['serviceCode']} already used by another file")
+                continue
+            services[data["serviceCode"]] = data
+    return services
+
+
+def compute_change_sets(outputs: Dict[str, Dict], baseline: CatalogueStore) -> Dict[str, List[Dict]]:
+    """Diff every output against the baseline; unchanged services are omitted."""
+    differ = ExtractionDiffer()
+    change_sets = {}
+    for code, service in outputs.items():
+        previous = baseline.get(code) if baseline.exists() else None
+        changes = differ.diff(previous, service)
+        if changes:
+            change_sets[code] = changes
+    return change_sets
+
+
+def upload_bulk(api_url: str, services: List[Dict], function_key: Optional[str] = None,
+                timeout: float = 300.0) -> Dict:
+    """POST services to the bulk import endpoint and return the parsed response."""
+    request = urllib.request.Request(
+        f"{api_url.rstrip('/')}/services/import/bulk",
+        data=json.dumps(services, ensure_ascii=False).encode('utf-8'),
+        headers={"Content-Type": "application/json"},
+        method="POST"
+    )
+    if function_key:
+        request.add_header("x-functions-key", function_key)
+
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+    except urllib.error.HTTPError as e:
+        # 207/400 responses from the bulk endpoint still carry per-service results
+        body = e.read().decode('utf-8', errors='replace')
+        try:
+            return json.loads(body)
+        except ValueError:
+            raise Exception(f"Bulk import failed with HTTP {e.code}: {body[:200]}")
+
+
+def _format_value(value) -> str:
+    text = json.dumps(value, ensure_ascii=False)
+    return text if len(text) <= 80 else text[:77] + "..."
+
+
+def main():
+    """Main execution."""
+    script_dir = Path(__file__).parent
+    output_dir = script_dir / "output"
+
+    option_values = {option(flag) for flag in ('--changes', '--upload', '--batch-size')}
+    args = [a for a in sys.argv[1:] if not a.startswith('--') and a not in option_values]
+    if args:
+        output_dir = Path(args[0])
+
+    if not output_dir.exists():
+        print(f"❌ Output directory not found: {output_dir}")
+        sys.exit(1)
+
+    baseline = CatalogueStore.open(output_dir, name=BASELINE_NAME)
+    outputs = load_outputs(output_dir)
+
+    if '--mark-imported' in sys.argv:
+        baseline.upsert(list(outputs.values()))
+        print(f"✅ Marked {len(outputs)} service(s) as imported")
+        return
+
+    change_sets = compute_change_sets(outputs, baseline)
+
+    print(f"🔍 Compared {len(outputs)} service(s) with the imported baseline")
+    print("=" * 80)
+    for code, changes in change_sets.items():
+        if changes[0]['path'] == '':
+            print(f"\n🆕 {code}: new service")
+            continue
+        print(f"\n📝 {code}: {len(changes)} change(s)")
+        for change in changes:
+            if change['op'] == 'change':
+                print(f"   ~ {change['path']}: {_format_value(change['old'])} → {_format_value(change['new'])}")
+            elif change['op'] == 'add':
+                print(f"   + {change['path']}: {_format_value(change['new'])}")
+            else:
+                print(f"   - {change['path']}")
+
+    unchanged = len(outputs) - len(change_sets)
+    print("\n" + "=" * 80)
+    print(f"📊 Changed: {len(change_sets)}  Unchanged (skipped): {unchanged}")
+
+    changes_file = option('--changes')
+    if changes_file:
+        atomic_write(Path(changes_file), json.dumps(change_sets, indent=2, ensure_ascii=False).encode('utf-8'))
+        print(f"💾 Change set saved to: {changes_file}")
+
+    api_url = option('--upload')
+    if not api_url or not change_sets:
+        return
+
+    # The bulk endpoint only creates services and rejects existing codes
+    # (DUPLICATE_CODE), so changes to imported services cannot be uploaded
+    already_imported = set(baseline.service_codes())
+    codes = [code for code in change_sets if code not in already_imported]
+    needs_update = [code for code in change_sets if code in already_imported]
+    if needs_update:
+        print(f"\n⚠️  {len(needs_update)} changed service(s) already imported - needs update, no update endpoint:")
+        for code in needs_update:
+            print(f"   {code}")
+    if not codes:
+        return
+
+    batch_size = int(option('--batch-size', '20'))
+    function_key = os.environ.get('IMPORT_FUNCTION_KEY')
+    imported = []
+    failed = 0
+
+    for start in range(0, len(codes), batch_size):
+        batch_codes = codes[start:start + batch_size]
+        batch = [outputs[code] for code in batch_codes]
+        print(f"\n📤 Uploading {len(batch)} new service(s)...")
+        try:
+            result = upload_bulk(api_url, batch, function_key)
+        except Exception as e:
+            print(f"❌ Upload failed: {str(e)}")
+            failed += len(batch)
+            continue
+
+        # Results come back in request order; failed ones carry serviceCode null
+        results = result.get("results", [])
+        for position, code in enumerate(batch_codes):
+            item = results[position] if position < len(results) else {"errors": ["no result returned"]}
+            if item.get("success"):
+                imported.append(outputs[code])
+            else:
+                failed += 1
+                print(f"   ❌ {code}: {item.get('errors')}")
+
+    # Only successfully imported services become the new baseline
+    if imported:
+        baseline.upsert(imported)
+
+    print(f"\n✅ Imported: {len(imported)}  ❌ Failed: {failed}  ⚠️  Needs update: {len(needs_update)}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
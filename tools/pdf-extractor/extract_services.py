@@ -13,11 +13,30 @@ import json
 import base64
 import os
 import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 import anthropic
 from jsonschema import validate, ValidationError
 from json_repair import repair_json
+from schema_normalizer import UNCHANGED, SchemaNormalizer
+from catalogue_store import CatalogueStore, print_collisions
+from common import atomic_write
+from dependency_index import DependencyIndex
+from run_journal import RunJournal, GracefulInterrupt
+from prompt_builder import build_extraction_prompt
+from pdf_segmenter import PdfSegmenter, find_segments, segmentation_available
+from work_queue import DEFAULT_LEASE_SECONDS, LEASED, LeaseKeeper, WorkQueue, open_queue, worker_id
+
+
+EXTRACTION_TOOL_NAME = "record_service"
+STATS_FILE = ".extraction-stats"
+FALLBACK_SERVICE_CODE = "ID999"
+DEFAULT_SEGMENT_WORKERS = 4
 
 
 class ServicePdfExtractor:
@@ -26,7 +45,8 @@ class ServicePdfExtractor:
     using Claude API.
     """
     
-    def __init__(self, api_key: str, schema_path: str, output_dir: Path = None, relaxed_mode: bool = False):
+    def __init__(self, api_key: str, schema_path: str, output_dir: Path = None, relaxed_mode: bool = False,
+                 tool_use: bool = False):
         """
         Initialize the PDF extractor.
         
@@ -35,6 +55,7 @@ class ServicePdfExtractor:
             schema_path: Path to JSON schema file
             output_dir: Directory for output files (for debug logging)
             relaxed_mode: If True, skip strict schema validation and save raw extractions
+            tool_use: If True, force structured output through a tool whose input_schema is the import schema
         """
         self.client = anthropic.Anthropic(api_key=api_key)
         self.schema = self._load_schema(schema_path)
@@ -42,6 +63,15 @@ class ServicePdfExtractor:
         self.max_tokens = 32000  # Increased from 16000 for larger PDFs
         self.output_dir = output_dir
         self.relaxed_mode = relaxed_mode
+        self.tool_use = tool_use
+        self.normalizer = SchemaNormalizer(self.schema)
+        self.stats = defaultdict(int)
+        self._stats_lock = threading.Lock()
+    
+    def _count(self, key: str) -> None:
+        """Increment an extraction statistics counter."""
+        with self._stats_lock:
+            self.stats[key] += 1
     
     def _load_schema(self, path: str) -> Dict:
         """Load JSON schema from file."""
@@ -67,13 +97,39 @@ class ServicePdfExtractor:
         with open(pdf_path, 'rb') as f:
             pdf_content = f.read()
         
+        return self.extract_from_document(pdf_content)
+    
+    def extract_from_document(self, pdf_content: bytes, segment: Optional[Dict] = None) -> Dict:
+        """
+        Extract structured JSON from PDF bytes using Claude API.
+        
+        Args:
+            pdf_content: PDF document (a whole file or one catalogue segment)
+            segment: Segment found by pdf_segmenter; see _apply_segment_code
+            
+        Returns:
+            Dictionary with extracted service data
+        """
         # Convert to base64
         pdf_base64 = base64.standard_b64encode(pdf_content).decode('utf-8')
         
         # Create extraction prompt
         prompt = self._create_extraction_prompt()
+        if segment:
+            prompt += (f"\n\nThis document is one section of a larger service catalogue. "
+                       f"It describes service {segment['serviceCode']} ({segment['title']}); "
+                       f"extract only this service.")
+        
+        # Structured output mode: the schema is the tool's input_schema and the tool is forced
+        tool_options = {}
+        if self.tool_use:
+            tool_options = {
+                "tools": [self._create_extraction_tool()],
+                "tool_choice": {"type": "tool", "name": EXTRACTION_TOOL_NAME}
+            }
         
-        print("🤖 Calling Claude API...")
+        print(f"🤖 Calling Claude API{' (tool use)' if self.tool_use else ''}...")
+        self._count("extractions")
         
         try:
             # Call Claude API with extended timeout for large PDFs
@@ -81,6 +137,7 @@ class ServicePdfExtractor:
                 model=self.model,
                 max_tokens=self.max_tokens,
                 timeout=900.0,  # 15 minutes timeout for large PDFs
+                **tool_options,
                 messages=[
                     {
                         "role": "user",
@@ -102,20 +159,37 @@ class ServicePdfExtractor:
                 ]
             )
             
-            # Extract JSON from response
-            json_text = self._extract_json_from_response(message.content)
+            # Checked in both modes so their statistics compare like for like; in text
+            # mode json_repair would otherwise silently close the cut-off JSON
+            if getattr(message, "stop_reason", None) == "max_tokens":
+                self._count("truncated")
+                raise Exception(f"Response truncated at max_tokens ({self.max_tokens}); output is incomplete")
             
-            # Parse JSON with automatic repair
-            service_data = self._parse_json_safely(json_text)
+            if self.tool_use:
+                # Tool input is already structured - no text parsing or repair
+                service_data = self._extract_tool_input(message)
+            else:
+                # Extract JSON from response
+                json_text = self._extract_json_from_response(message.content)
+                
+                # Parse JSON with automatic repair
+                service_data = self._parse_json_safely(json_text)
             
             print("✅ Extraction successful")
             
             # Normalize data structure before validation
-            service_data = self._normalize_tools_and_environment(service_data)
+            service_data = self._normalize(service_data)
+            
+            if segment:
+                self._apply_segment_code(service_data, segment)
             
             # Validate against schema (unless relaxed mode)
             if not self.relaxed_mode:
-                self._validate_against_schema(service_data)
+                try:
+                    self._validate_against_schema(service_data)
+                except ValidationError:
+                    self._count("validation_failed")
+                    raise
             else:
                 print("⚠️  Relaxed mode: Skipping strict schema validation")
                 # Still try to detect obvious issues
@@ -126,173 +200,58 @@ class ServicePdfExtractor:
             return service_data
             
         except anthropic.APIError as e:
+            self._count("api_errors")
             raise Exception(f"Claude API error: {str(e)}")
         except json.JSONDecodeError as e:
             raise Exception(f"Failed to parse JSON response: {str(e)}")
         except Exception as e:
             raise Exception(f"Extraction failed: {str(e)}")
     
+    def _apply_segment_code(self, data: Dict, segment: Dict) -> None:
+        """
+        Put the segment's code onto the extraction.
+        
+        Outline segments come from the catalogue's own bookmarks, so their code is
+        forced: the output file and journal entry are named by it and a different
+        extracted code (often a placeholder or the fallback) would make file and
+        content disagree. Heading segments are a guess from page text; their code
+        only fills in a missing code and a different extracted code is kept.
+        """
+        code = data.get("serviceCode")
+        if code in (None, "", FALLBACK_SERVICE_CODE, segment["serviceCode"]):
+            data["serviceCode"] = segment["serviceCode"]
+        elif segment["source"] == "outline":
+            print(f"⚠️  Extracted serviceCode {code} replaced by outline entry {segment['serviceCode']}")
+            data["serviceCode"] = segment["serviceCode"]
+        else:
+            print(f"⚠️  Extracted serviceCode {code} differs from page heading {segment['serviceCode']}; keeping {code}")
+    
     def _create_extraction_prompt(self) -> str:
-        """Create the extraction prompt for Claude."""
-        return f"""You are extracting structured data from a Service Catalogue PDF document.
-
-**Task:** Extract ALL information from the PDF and structure it as JSON according to the provided schema.
-
-**JSON Schema Reference:**
-The output must conform to the service import JSON schema with the following structure:
-- serviceCode (required, pattern: ID0XX)
-- serviceName (required)
-- version (default: v1.0)
-- category (required)
-- description (required)
-- notes (optional)
-- usageScenarios (array of scenarios with scenarioNumber, scenarioTitle, scenarioDescription)
-- dependencies (object with prerequisite, triggersFor, parallelWith arrays)
-- scope (object with inScope and outOfScope)
-- prerequisites (organizational, technical, documentation)
-- toolsAndEnvironment (cloudPlatforms, designTools, automationTools, etc.)
-- licenses (requiredByCustomer, recommendedOptional, providedByServiceProvider)
-- stakeholderInteraction (interactionLevel, customerMustProvide, workshopParticipation, accessRequirements)
-- serviceInputs (array of parameters with requirementLevel)
-- serviceOutputs (array of output categories with items)
-- timeline (phases array)
-- sizeOptions (array with S/M/L sizing, effort breakdown, complexity additions, team allocation, examples)
-- responsibleRoles (array of roles)
-- multiCloudConsiderations (array of considerations)
-
-**Critical Instructions:**
-
-1. **Service Code & Basic Info:**
-   - Extract the ID code from the PDF (e.g., ID001, ID002, ID003, etc.)
-   - IMPORTANT: serviceCode MUST be exactly 5 characters: ID followed by 3 digits (pattern: ^ID[0-9]{{3}}$)
-   - NEVER use placeholder like "ID0XX" or "IDXXX" - extract the ACTUAL service code from the document
-   - If no service code is visible in the PDF, look for it in headers, footers, or title pages
-   - If truly not found, use ID999 as a last resort (but this should be rare)
-   - Extract full service name
-   - Extract version (default to v1.0 if not specified)
-   - Extract category path (e.g., "Services/Architecture/Technical Architecture")
-   - Extract complete description
-
-2. **Usage Scenarios:**
-   - Extract ALL numbered scenarios (typically 6-8)
-   - Include scenarioNumber, scenarioTitle, and full scenarioDescription
-   - Preserve order with sortOrder
-
-3. **Dependencies:**
-   - Group into three types: prerequisite, triggersFor, parallelWith
-   - For each dependency include: serviceName, serviceCode (if mentioned), requirementLevel (REQUIRED/RECOMMENDED/OPTIONAL)
-
-4. **Scope:**
-   - In-scope: Extract all numbered categories with their items
-   - Each category should have categoryName, categoryNumber (if numbered), and items array
-   - Out-of-scope: Extract all bullet points as simple strings
-
-5. **Prerequisites:**
-   - Group by category: organizational, technical, documentation
-   - For each prerequisite: name, description, requirementLevel
-
-6. **Tools and Environment:**
-   - Group by category: cloudPlatforms, designTools, automationTools, collaborationTools
-   - CRITICAL: Each tool MUST be an object with these properties:
-     * category: string (e.g., "Diagramming", "IaC", "Collaboration")
-     * toolName: string (name of the tool)
-     * version: string (version if specified, empty string if not)
-     * purpose: string (description of what the tool is used for)
-   - NEVER use simple strings - ALWAYS use objects
-   - Example: { "category": "Diagramming", "toolName": "Visio", "version": "", "purpose": "Architecture diagrams" }
-
-7. **Licenses:**
-   - Group into: requiredByCustomer, recommendedOptional, providedByServiceProvider
-   - For each: licenseName, licenseType, description
-
-8. **Stakeholder Interaction:**
-   - Extract interactionLevel (LOW/MEDIUM/HIGH)
-   - Extract "Customer Must Provide" list as array of STRINGS (NOT objects)
-     * Each item should be a simple string describing what customer must provide
-     * Example: ["Azure subscription access", "Business requirements documentation", "Stakeholder availability"]
-   - Extract workshop participation as array of OBJECTS with:
-     * roleName: string (e.g., "Solutions Architect", "Business Analyst")
-     * involvementLevel: ENUM - MUST be one of: REQUIRED, RECOMMENDED, OPTIONAL, AS_NEEDED
-     * CRITICAL: involvementLevel must be EXACT enum value, NOT descriptive text
-     * Example: {{ "roleName": "Solutions Architect", "involvementLevel": "REQUIRED" }}
-   - Extract access requirements as array of OBJECTS (NOT strings):
-     * Each access requirement MUST be an object with:
-       - requirementType: string (e.g., "Azure Subscription", "Network Access")
-       - description: string (detailed description)
-       - isMandatory: boolean (true/false)
-     * Example: {{ "requirementType": "Network Access", "description": "VPN or ExpressRoute", "isMandatory": true }}
-
-9. **Service Inputs:**
-   - Extract ALL input parameters
-   - Include: parameterName, description, requirementLevel (REQUIRED/RECOMMENDED/OPTIONAL)
-   - Include dataType, defaultValue, exampleValue if mentioned
-
-10. **Service Outputs:**
-    - Extract all numbered output categories
-    - For each category: categoryName, categoryNumber, items array
-    - Each item should have itemName and itemDescription
-
-11. **Timeline:**
-    - IMPORTANT: Timeline is an OBJECT with a "phases" property (not a direct array)
-    - Structure: {{ "phases": [ phase1, phase2, ... ] }}
-    - Extract all phases with phaseNumber, phaseName, description
-    - Include durationBySize (small, medium, large) if provided
-    - Example: {{ "phases": [{{ "phaseNumber": 1, "phaseName": "Discovery", ... }}] }}
-
-12. **Size Options (CRITICAL - Most Complex Section):**
-    - Extract ALL size options (S, M, L, typically 3)
-    - For EACH size option extract:
-      a) Basic info: sizeCode, description, duration, durationInDays
-      b) Effort: hours (or hoursMin/hoursMax range), currency
-      c) teamSize (STRING, e.g. "2-3 people", "4-5 FTE"), complexity (LOW/MEDIUM/HIGH)
-      d) sizingCriteria: array of criteria with criteriaName and values
-      e) effortBreakdown: array with scopeArea, baseHours, notes
-      f) complexityAdditions: array with factor, condition, additionalHours
-      g) teamAllocation: array with role, allocation (FTE), notes
-      h) examples: array with exampleName, scenario, description, characteristics (name/value pairs), deliverables
-      i) scopeDependencies: array with scopeArea and requires array
-      j) sizingParameters: array with parameterName, parameterType (SCALE/TECHNICAL), description, values
-
-13. **Responsible Roles:**
-    - Extract all roles
-    - For each: roleName, isPrimaryOwner (true for primary, false otherwise), responsibilities
-
-14. **Multi-Cloud Considerations:**
-    - Extract all considerations as array
-    - Each with: considerationTitle, description
-
-**Output Format:**
-- Return ONLY valid JSON
-- No markdown code blocks (no ```json)
-- No explanations or preamble
-- Start directly with {{ and end with }}
-- Use null for missing optional fields
-- Use empty arrays [] for missing array fields
-- Ensure all required fields are present
-
-**CRITICAL: Service Code Validation:**
-- serviceCode must match pattern: ^ID[0-9]{{3}}$
-- VALID examples: "ID001", "ID002", "ID123"
-- INVALID examples: "ID0XX", "IDXXX", "ID01", "ID1234"
-- Extract the ACTUAL service code from the PDF - look in headers, title, first page
-- If not found in PDF, use "ID999" but this should be VERY RARE
-
-**Data Type Rules:**
-- Strings: Use quotes
-- Numbers: No quotes (e.g., 160, 240, 0.5)
-- Booleans: true or false (no quotes)
-- Arrays: Use [] even if empty
-- Objects: Use {{}} even if empty
-- Enums: Use exact values (REQUIRED, RECOMMENDED, OPTIONAL, LOW, MEDIUM, HIGH, S, M, L)
-
-**Quality Checks:**
-- Preserve ALL details - do not summarize
-- Maintain exact hierarchies (categories → items)
-- Keep original numbers (hours, days, FTE allocations)
-- Extract ALL examples for each size option
-- Include ALL characteristics for each example
-
-Begin extraction now. Return only the JSON object:"""
+        """
+        Create the extraction prompt for Claude.
+        The structural part is generated from the schema (memoized per schema hash).
+        """
+        return build_extraction_prompt(self.schema, tool_use=self.tool_use)
+    
+    def _create_extraction_tool(self) -> Dict:
+        """Create the tool definition whose input_schema is the import schema."""
+        input_schema = {k: v for k, v in self.schema.items() if k not in ("$schema", "$id")}
+        input_schema.setdefault("type", "object")
+        return {
+            "name": EXTRACTION_TOOL_NAME,
+            "description": "Record the complete service catalogue entry extracted from the PDF document.",
+            "input_schema": input_schema
+        }
+    
+    def _extract_tool_input(self, message) -> Dict:
+        """Take the structured tool input from Claude's response."""
+        for block in message.content:
+            if getattr(block, "type", None) == "tool_use" and block.name == EXTRACTION_TOOL_NAME:
+                self._count("tool_input")
+                return block.input
+        
+        self._count("parse_failed")
+        raise Exception(f"Response contains no '{EXTRACTION_TOOL_NAME}' tool call")
     
     def _extract_json_from_response(self, content) -> str:
         """Extract JSON from Claude's response."""
@@ -318,7 +277,9 @@ Begin extraction now. Return only the JSON object:"""
         """
         try:
             # First try: standard parse
-            return json.loads(json_text)
+            result = json.loads(json_text)
+            self._count("parsed_directly")
+            return result
         except json.JSONDecodeError as e:
             print(f"⚠️  JSON parse error at line {e.lineno}, col {e.colno}")
             print(f"   Message: {e.msg}")
@@ -328,9 +289,11 @@ Begin extraction now. Return only the JSON object:"""
                 # Second try: repair and parse
                 repaired = repair_json(json_text)
                 result = json.loads(repaired)
+                self._count("repaired")
                 print("✅ JSON repaired successfully")
                 return result
             except Exception as repair_error:
+                self._count("parse_failed")
                 print(f"❌ JSON repair failed: {str(repair_error)}")
                 if self.output_dir:
                     self._save_debug_json(json_text, e)
@@ -444,68 +407,18 @@ Begin extraction now. Return only the JSON object:"""
         else:
             return f"Schema expects {expected}, got {actual}"
     
-    def _normalize_tools_and_environment(self, data: Dict) -> Dict:
+    def _normalize(self, data: Dict) -> Dict:
         """
-        Normalize toolsAndEnvironment structure to match schema requirements.
-        Converts strings and incorrectly structured objects to proper toolItem format.
+        Apply declarative normalization rules (normalization_rules.json).
+        Coerces schema type mismatches locally instead of failing the extraction.
         """
-        if "toolsAndEnvironment" not in data:
-            return data
-        
-        tools_env = data["toolsAndEnvironment"]
-        tool_categories = ["cloudPlatforms", "designTools", "automationTools", "collaborationTools", "other"]
-        
-        for category in tool_categories:
-            if category not in tools_env:
-                continue
-                
-            items = tools_env[category]
-            if not isinstance(items, list):
-                continue
-            
-            normalized_items = []
-            for item in items:
-                # If item is a string, convert to toolItem object
-                if isinstance(item, str):
-                    normalized_items.append({
-                        "category": category.replace("Tools", "").replace("Platforms", "Platform").title(),
-                        "toolName": item,
-                        "version": "",
-                        "purpose": ""
-                    })
-                # If item is a dict but has wrong structure (e.g., 'tools' instead of 'toolName')
-                elif isinstance(item, dict):
-                    # Check if it already has the correct structure
-                    if "toolName" in item:
-                        normalized_items.append(item)
-                    # Handle legacy format with 'tools' field
-                    elif "tools" in item:
-                        tools_list = item["tools"].split(",") if isinstance(item["tools"], str) else [item["tools"]]
-                        for tool_name in tools_list:
-                            normalized_items.append({
-                                "category": item.get("category", ""),
-                                "toolName": tool_name.strip(),
-                                "version": item.get("version", ""),
-                                "purpose": item.get("purpose", "")
-                            })
-                    # Handle cloudPlatforms with capability/aws/azure/gcp structure
-                    elif any(k in item for k in ["capability", "aws", "azure", "gcp"]):
-                        capability = item.get("capability", "Multi-cloud")
-                        for platform in ["aws", "azure", "gcp"]:
-                            if platform in item and item[platform]:
-                                platform_name = {"aws": "AWS", "azure": "Azure", "gcp": "GCP"}[platform]
-                                normalized_items.append({
-                                    "category": "Cloud Platform",
-                                    "toolName": platform_name,
-                                    "version": "",
-                                    "purpose": capability
-                                })
-                    else:
-                        # Keep as is if we don't know how to normalize
-                        normalized_items.append(item)
-            
-            tools_env[category] = normalized_items
-        
+        data, changes = self.normalizer.normalize(data)
+        if changes:
+            applied = [c for c in changes if c['after'] != UNCHANGED]
+            print(f"🔧 Normalized {len(applied)} field(s) using normalization rules")
+            for change in changes:
+                if change.get('review'):
+                    print(f"   👀 {change['path']}: {', '.join(change['review'])} needs manual review")
         return data
     
     def _validate_against_schema(self, data: Dict) -> None:
@@ -522,7 +435,9 @@ Begin extraction now. Return only the JSON object:"""
 def process_pdf_file(
     extractor: ServicePdfExtractor,
     pdf_path: Path,
-    output_dir: Path
+    output_dir: Path,
+    catalogue_records: Optional[List[tuple]] = None,
+    journal: Optional[RunJournal] = None
 ) -> bool:
     """
     Process a single PDF file and save JSON output.
@@ -531,10 +446,15 @@ def process_pdf_file(
         extractor: ServicePdfExtractor instance
         pdf_path: Path to PDF file
         output_dir: Directory for output JSON
+        catalogue_records: If given, (data, output file) pairs are collected here for the consolidated catalogue
+        journal: Run journal recording in-flight/done/failed states
         
     Returns:
         True if successful, False otherwise
     """
+    if journal:
+        journal.mark_in_flight(pdf_path)
+    
     try:
         # Extract JSON from PDF
         service_data = extractor.extract_from_pdf(str(pdf_path))
@@ -542,26 +462,299 @@ def process_pdf_file(
         # Determine output filename
         output_file = output_dir / f"{pdf_path.stem}.json"
         
-        # Save JSON
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(service_data, f, indent=2, ensure_ascii=False)
+        # Save JSON atomically (a crash never leaves a half-written file)
+        atomic_write(output_file, json.dumps(service_data, indent=2, ensure_ascii=False).encode('utf-8'))
+        
+        if journal:
+            journal.mark_done(pdf_path, [output_file])
         
         print(f"💾 Saved to: {output_file}")
+        
+        if catalogue_records is not None:
+            catalogue_records.append((service_data, output_file))
         print(f"📊 Service Code: {service_data.get('serviceCode', 'N/A')}")
         print(f"📊 Service Name: {service_data.get('serviceName', 'N/A')}")
         
         return True
         
     except Exception as e:
+        if journal:
+            journal.mark_failed(pdf_path, str(e))
         print(f"❌ Failed to process {pdf_path.name}: {str(e)}")
         return False
 
 
+def process_catalogue_pdf(
+    extractor: ServicePdfExtractor,
+    pdf_path: Path,
+    segments: List[Dict],
+    output_dir: Path,
+    catalogue_records: Optional[List[tuple]] = None,
+    journal: Optional[RunJournal] = None,
+    interrupt: Optional[GracefulInterrupt] = None,
+    workers: int = DEFAULT_SEGMENT_WORKERS
+) -> tuple:
+    """
+    Extract a multi-service catalogue PDF segment by segment.
+    
+    Each segment's page range is sent as its own document, with up to
+    `workers` extractions in flight, and saved as one output per serviceCode.
+    
+    Args:
+        extractor: ServicePdfExtractor instance
+        pdf_path: Path to the catalogue PDF
+        segments: Service segments found by pdf_segmenter
+        output_dir: Directory for output JSON
+        catalogue_records: If given, (data, output file) pairs are collected here for the consolidated catalogue
+        journal: Run journal; each segment is journaled as '<file>#<serviceCode>'
+        interrupt: Stop request; segments not yet started are cancelled
+        workers: Number of concurrent extractions
+        
+    Returns:
+        Tuple of (successful, failed, cancelled) segment counts
+    """
+    if journal:
+        journal.mark_in_flight(pdf_path)
+    
+    outputs = {s["serviceCode"]: output_dir / f"{pdf_path.stem} - {s['serviceCode']}.json" for s in segments}
+    pending = [s for s in segments if not (journal and journal.is_done(pdf_path, part=s["serviceCode"]))]
+    if len(pending) < len(segments):
+        print(f"⏯️  {len(segments) - len(pending)} segment(s) already done")
+    
+    segmenter = PdfSegmenter(pdf_path)
+    # pypdf readers are not thread-safe; each worker cuts its own segment under
+    # this lock, so only the segments in flight are held in memory
+    cut_lock = threading.Lock()
+    
+    def extract_segment(segment: Dict) -> Dict:
+        code = segment["serviceCode"]
+        if journal:
+            journal.mark_in_flight(pdf_path, part=code)
+        print(f"📄 Segment {code}: pages {segment['start'] + 1}-{segment['end']} ({segment['title']})")
+        with cut_lock:
+            pdf_content = segmenter.write_segment(segment)
+        service_data = extractor.extract_from_document(pdf_content, segment)
+        atomic_write(outputs[code], json.dumps(service_data, indent=2, ensure_ascii=False).encode('utf-8'))
+        if journal:
+            journal.mark_done(pdf_path, [outputs[code]], part=code)
+        return service_data
+    
+    success_count = 0
+    failure_count = 0
+    cancelled_count = 0
+    
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(extract_segment, s): s for s in pending}
+        for future in as_completed(futures):
+            code = futures[future]["serviceCode"]
+            if future.cancelled():
+                cancelled_count += 1
+                continue
+            try:
+                service_data = future.result()
+            except Exception as e:
+                if journal:
+                    journal.mark_failed(pdf_path, str(e), part=code)
+                print(f"❌ Failed to process segment {code} of {pdf_path.name}: {str(e)}")
+                failure_count += 1
+            else:
+                print(f"💾 Saved to: {outputs[code]}")
+                if catalogue_records is not None:
+                    catalogue_records.append((service_data, outputs[code]))
+                success_count += 1
+            
+            if interrupt and interrupt.stop_requested:
+                for other in futures:
+                    other.cancel()
+    
+    if journal:
+        if all(journal.is_done(pdf_path, part=code) for code in outputs):
+            journal.mark_done(pdf_path, list(outputs.values()))
+        elif failure_count:
+            journal.mark_failed(pdf_path, f"{failure_count} segment(s) failed")
+    
+    return success_count, failure_count, cancelled_count
+
+
+def extract_file(
+    extractor: ServicePdfExtractor,
+    pdf_path: Path,
+    output_dir: Path,
+    catalogue_records: Optional[List[tuple]] = None,
+    journal: Optional[RunJournal] = None,
+    interrupt: Optional[GracefulInterrupt] = None,
+    split_catalogues: bool = True,
+    workers: int = DEFAULT_SEGMENT_WORKERS,
+    split_headings: bool = False
+) -> tuple:
+    """
+    Extract one PDF, splitting catalogue books into one extraction per service.
+    
+    Catalogues are split by their outline; split_headings also splits PDFs
+    without a coded outline at IDnnn heading lines (--split).
+    
+    Returns:
+        Tuple of (successful, failed, cancelled) extraction counts
+    """
+    segments = find_segments(pdf_path, split_headings) if split_catalogues else None
+    if segments:
+        print(f"📚 Catalogue PDF: {len(segments)} service(s) found via {segments[0]['source']}")
+        return process_catalogue_pdf(extractor, pdf_path, segments, output_dir,
+                                     catalogue_records, journal, interrupt, workers)
+    if process_pdf_file(extractor, pdf_path, output_dir, catalogue_records, journal):
+        return 1, 0, 0
+    return 0, 1, 0
+
+
+def load_outputs(paths: List[Path]) -> List[tuple]:
+    """Read existing outputs as (data, output file) pairs; unreadable files are skipped."""
+    records = []
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                records.append((json.load(f), path))
+        except Exception as e:
+            print(f"⚠️  Skipping {path.name} for the catalogue: {str(e)}")
+    return records
+
+
+def run_queue_worker(
+    work_queue: WorkQueue,
+    extractor: ServicePdfExtractor,
+    pdf_dir: Path,
+    output_dir: Path,
+    interrupt: GracefulInterrupt,
+    split_catalogues: bool = True,
+    workers: int = DEFAULT_SEGMENT_WORKERS,
+    split_headings: bool = False
+) -> tuple:
+    """
+    Claim and extract PDFs from a shared queue until it is drained.
+    
+    The lease is renewed while a PDF is extracted; when this process dies
+    the lease expires and another worker takes the PDF over.
+    
+    Returns:
+        Tuple of (successful, failed, files processed)
+    """
+    me = worker_id()
+    poll_seconds = min(30, work_queue.lease_seconds / 4)
+    success_count = 0
+    failure_count = 0
+    files_processed = 0
+    
+    while not interrupt.stop_requested:
+        lease = work_queue.claim(me)
+        if lease is None:
+            if work_queue.counts()[LEASED] == 0:
+                break
+            # Other workers still hold leases; wait in case one of them crashed
+            time.sleep(poll_seconds)
+            continue
+        
+        pdf_file = pdf_dir / lease["task"]
+        print(f"\n[{me}] Claimed: {pdf_file.name} (attempt {lease['attempt']})")
+        print("-" * 60)
+        
+        if not pdf_file.exists():
+            work_queue.fail(lease, f"PDF not found on {me}: {pdf_file}")
+            print(f"❌ PDF not found: {pdf_file}")
+            failure_count += 1
+            continue
+        
+        with LeaseKeeper(work_queue, lease) as keeper:
+            succeeded, failed, cancelled = extract_file(extractor, pdf_file, output_dir, None, None,
+                                                        interrupt, split_catalogues, workers, split_headings)
+        success_count += succeeded
+        failure_count += failed
+        files_processed += 1
+        
+        # A worker that was paused or cut off past its lease must not finish a task
+        # another worker now owns; the final renew also catches a loss since the last renewal
+        if keeper.lost or not work_queue.renew(lease):
+            print(f"⚠️  Lease on {pdf_file.name} was lost; leaving the task to its new owner")
+        elif failed:
+            work_queue.fail(lease, f"{failed} extraction(s) failed")
+        elif cancelled:
+            work_queue.release(lease)
+        else:
+            work_queue.complete(lease)
+        
+        print("-" * 60)
+    
+    return success_count, failure_count, files_processed
+
+
+def record_run_stats(output_dir: Path, extractor: ServicePdfExtractor) -> None:
+    """Append this run's parse/repair counters to the stats log."""
+    if not extractor.stats.get("extractions"):
+        return
+    record = {
+        "ts": datetime.now().isoformat(timespec="seconds"),
+        "mode": "tool_use" if extractor.tool_use else "text",
+        **extractor.stats
+    }
+    with open(output_dir / STATS_FILE, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def print_run_stats(output_dir: Path) -> None:
+    """
+    Print repair and failure rates per output mode across all recorded runs.
+    Every parse or validation failure means another full extraction.
+    """
+    stats_path = output_dir / STATS_FILE
+    if not stats_path.exists():
+        return
+    
+    totals = defaultdict(lambda: defaultdict(int))
+    with open(stats_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            for key, value in record.items():
+                if isinstance(value, int):
+                    totals[record.get("mode", "text")][key] += value
+    
+    print(f"\n📈 Parse statistics (all recorded runs)")
+    print(f"   {'Mode':<10}{'Extractions':>13}{'Repaired':>10}{'Parse fail':>12}{'Truncated':>11}"
+          f"{'Invalid':>10}{'Re-run':>10}")
+    for mode, counts in sorted(totals.items()):
+        extractions = counts["extractions"] or 1
+        failed = counts["parse_failed"] + counts["truncated"]
+        rerun = failed + counts["validation_failed"]
+        print(f"   {mode:<10}{counts['extractions']:>13}"
+              f"{counts['repaired'] / extractions:>10.1%}{counts['parse_failed'] / extractions:>12.1%}"
+              f"{counts['truncated'] / extractions:>11.1%}"
+              f"{counts['validation_failed'] / extractions:>10.1%}{rerun / extractions:>10.1%}")
+    print(f"   Extractions = API calls (one per PDF or catalogue segment); truncated = stopped at max_tokens")
+
+
 def main():
     """Main execution function."""
     
     # Parse command line arguments
     relaxed_mode = '--relaxed' in sys.argv or '--no-validation' in sys.argv
+    resume = '--resume' in sys.argv
+    tool_use = '--tool-use' in sys.argv
+    compressed_catalogue = '--zstd' in sys.argv
+    write_catalogue = '--catalogue' in sys.argv or compressed_catalogue
+    split_catalogues = '--no-split' not in sys.argv
+    split_headings = '--split' in sys.argv
+    workers = DEFAULT_SEGMENT_WORKERS
+    if '--workers' in sys.argv:
+        position = sys.argv.index('--workers')
+        workers = int(sys.argv[position + 1]) if position + 1 < len(sys.argv) else DEFAULT_SEGMENT_WORKERS
+    queue_location = None
+    if '--queue' in sys.argv:
+        position = sys.argv.index('--queue')
+        queue_location = Path(sys.argv[position + 1]) if position + 1 < len(sys.argv) else None
+    lease_seconds = DEFAULT_LEASE_SECONDS
+    if '--lease' in sys.argv:
+        position = sys.argv.index('--lease')
+        lease_seconds = int(sys.argv[position + 1]) if position + 1 < len(sys.argv) else DEFAULT_LEASE_SECONDS
     
     # Configuration
     API_KEY = os.environ.get('ANTHROPIC_API_KEY')
@@ -576,6 +769,11 @@ def main():
     schema_path = project_root / "schemas" / "service-import-schema.json"
     pdf_dir = script_dir / "pdfs"
     output_dir = script_dir / "output"
+    # Shared-queue workers point these at the shared volume
+    if '--pdf-dir' in sys.argv and sys.argv.index('--pdf-dir') + 1 < len(sys.argv):
+        pdf_dir = Path(sys.argv[sys.argv.index('--pdf-dir') + 1])
+    if '--output-dir' in sys.argv and sys.argv.index('--output-dir') + 1 < len(sys.argv):
+        output_dir = Path(sys.argv[sys.argv.index('--output-dir') + 1])
     
     # Check paths
     if not schema_path.exists():
@@ -589,45 +787,131 @@ def main():
         sys.exit(0)
     
     # Create output directory
-    output_dir.mkdir(exist_ok=True)
+    output_dir.mkdir(parents=True, exist_ok=True)
     
     # Find PDF files
-    pdf_files = list(pdf_dir.glob("*.pdf"))
+    pdf_files = sorted(pdf_dir.glob("*.pdf"))
     
     if not pdf_files:
         print(f"⚠️  No PDF files found in {pdf_dir}")
         print(f"   Please place PDF files in this directory")
         sys.exit(0)
     
+    total_files = len(pdf_files)
+    work_queue = None
+    journal = None
+    resumed_outputs = []
+    if queue_location:
+        # Shared queue: the queue replaces the local journal, every worker enqueues what it sees
+        work_queue = open_queue(queue_location, lease_seconds=lease_seconds)
+        added = work_queue.enqueue([p.name for p in pdf_files])
+        if write_catalogue:
+            print("ℹ️  --catalogue is ignored in queue mode; build it once all workers are done:")
+            print(f"   python {script_dir / 'catalogue_store.py'} build --dir {output_dir}")
+            write_catalogue = False
+    else:
+        # Open run journal (skip files completed by an interrupted run)
+        journal = RunJournal(output_dir, resume=resume)
+        if resume and write_catalogue:
+            # Files and segments the interrupted run finished are skipped below; keep them in the catalogue
+            resumed_outputs = journal.done_outputs(pdf_files)
+        pdf_files = journal.pending(pdf_files)
+        journal.mark_queued(pdf_files)
+    
     print(f"🚀 Service Catalog PDF Extractor")
     print(f"=" * 60)
     print(f"Schema: {schema_path.name}")
     print(f"PDF Directory: {pdf_dir}")
     print(f"Output Directory: {output_dir}")
-    print(f"Found {len(pdf_files)} PDF file(s)")
+    print(f"Found {total_files} PDF file(s)")
+    if work_queue:
+        counts = work_queue.counts()
+        print(f"🌐 SHARED QUEUE: {queue_location} ({added} new task(s); "
+              f"{counts['queued']} queued, {counts['leased']} leased, {counts['done']} done)")
+    elif resume:
+        print(f"⏯️  Resuming: {total_files - len(pdf_files)} already done, {len(pdf_files)} remaining")
     if relaxed_mode:
         print(f"⚠️  RELAXED MODE: Schema validation disabled")
         print(f"   Run 'python analyze_extractions.py' after extraction")
+    if tool_use:
+        print(f"🧰 TOOL-USE MODE: structured output via forced tool call")
+    if write_catalogue:
+        print(f"📚 Consolidated catalogue: enabled{' (zstd)' if compressed_catalogue else ''}")
+    if split_catalogues and segmentation_available():
+        split_by = "outline or IDnnn headings" if split_headings else "outline"
+        print(f"✂️  Catalogue PDFs are split per service by {split_by} ({workers} concurrent extraction(s))")
+    elif split_catalogues:
+        print(f"ℹ️  Catalogue splitting unavailable - install pypdf to split multi-service PDFs")
     print(f"=" * 60)
     print()
     
     # Initialize extractor
-    extractor = ServicePdfExtractor(API_KEY, str(schema_path), output_dir, relaxed_mode=relaxed_mode)
+    extractor = ServicePdfExtractor(API_KEY, str(schema_path), output_dir, relaxed_mode=relaxed_mode,
+                                    tool_use=tool_use)
     
     # Process each PDF
     success_count = 0
     failure_count = 0
+    catalogue_records = load_outputs(resumed_outputs) if write_catalogue else None
     
-    for i, pdf_file in enumerate(pdf_files, 1):
-        print(f"\n[{i}/{len(pdf_files)}] Processing: {pdf_file.name}")
-        print("-" * 60)
-        
-        if process_pdf_file(extractor, pdf_file, output_dir):
-            success_count += 1
+    interrupted = False
+    files_processed = 0
+    
+    with GracefulInterrupt() as interrupt:
+        if work_queue:
+            success_count, failure_count, files_processed = run_queue_worker(
+                work_queue, extractor, pdf_dir, output_dir, interrupt, split_catalogues, workers, split_headings)
         else:
-            failure_count += 1
+            for i, pdf_file in enumerate(pdf_files, 1):
+                if interrupt.stop_requested:
+                    interrupted = True
+                    break
+                
+                print(f"\n[{i}/{len(pdf_files)}] Processing: {pdf_file.name}")
+                print("-" * 60)
+                
+                succeeded, failed, _ = extract_file(extractor, pdf_file, output_dir, catalogue_records, journal,
+                                                    interrupt, split_catalogues, workers, split_headings)
+                success_count += succeeded
+                failure_count += failed
+                files_processed += 1
+                
+                print("-" * 60)
         
-        print("-" * 60)
+        # A stop requested during the last file still cancels its remaining segments
+        interrupted = interrupted or interrupt.stop_requested
+    
+    if work_queue:
+        work_queue.close()
+    else:
+        journal.close()
+    record_run_stats(output_dir, extractor)
+    
+    # Update consolidated catalogue
+    if catalogue_records:
+        try:
+            catalogue = CatalogueStore(output_dir, compressed=compressed_catalogue)
+            collisions = catalogue.upsert([data for data, _ in catalogue_records],
+                                          [path for _, path in catalogue_records])
+            print_collisions(collisions)
+            print(f"\n📚 Catalogue updated: {catalogue.data_path.name} ({len(catalogue.service_codes())} service(s))")
+        except Exception as e:
+            print(f"\n❌ Failed to update catalogue: {str(e)}")
+    
+    # Refresh dependency index (only changed outputs are re-read)
+    if success_count > 0:
+        try:
+            dependency_index = DependencyIndex(output_dir)
+            dependency_index.rebuild()
+            dependency_index.save()
+            analysis = dependency_index.analyze()
+            duplicates = len(analysis['duplicates']['codes']) + len(analysis['duplicates']['names'])
+            print(f"\n🔗 Dependency index: {len(analysis['dangling'])} dangling reference(s), "
+                  f"{len(analysis['cycles'])} cycle(s), {duplicates} duplicate code(s)/name(s)")
+            if analysis['dangling'] or analysis['cycles'] or duplicates:
+                print(f"   Run: python {script_dir / 'dependency_index.py'} for details")
+        except Exception as e:
+            print(f"\n⚠️  Failed to update dependency index: {str(e)}")
     
     # Summary
     print(f"\n{'=' * 60}")
@@ -636,8 +920,19 @@ def main():
     print(f"✅ Successful: {success_count}")
     print(f"❌ Failed: {failure_count}")
     print(f"📁 Output directory: {output_dir}")
+    print_run_stats(output_dir)
     print()
     
+    if interrupted:
+        if work_queue:
+            print(f"⏸️  Worker stopped: unfinished PDFs were given back to the queue")
+            print(f"   Queue status: python {script_dir / 'work_queue.py'} status {queue_location}")
+        else:
+            remaining = len(pdf_files) - files_processed
+            print(f"⏸️  Run interrupted: {remaining} file(s) not processed")
+            print(f"   Continue with: python {script_dir / 'extract_services.py'} --resume")
+        print()
+    
     if success_count > 0:
         print("✅ Extraction complete! JSON files are ready")
         if relaxed_mode:
@@ -652,6 +947,9 @@ def main():
         if not relaxed_mode:
             print("💡 Tip: Try running with --relaxed flag to skip validation")
         sys.exit(1)
+    
+    if interrupted:
+        sys.exit(130)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,535 @@
+"""
+Import API Load Test
+====================
+
+Load generator for the backend import endpoints (services/import and
+services/import/bulk in ImportFunction.cs). Synthetic services are derived
+from real extracted outputs: every service gets its own serviceCode and its
+arrays are shrunk or grown, so payload sizes vary like a real catalogue.
+
+The run sweeps concurrency (and batch size for the bulk endpoint) and
+reports throughput, p50/p95/p99 latency and error rates per step.
+
+The backend rejects codes that already exist, and codes must match
+^ID\\d{3}$, so a sweep can import at most 1000 services in total. Use a
+disposable database, or --reuse-codes to measure the rejection path.
+
+Usage:
+    python load_test.py run [--api http://localhost:7071/api] [--source output/]
+                            [--services 100] [--endpoint bulk|single|both]
+                            [--concurrency 1,4,16] [--batch-sizes 10,50]
+                            [--code-start 0] [--reuse-codes] [--seed 42]
+                            [--report load-test.json] [--stub]
+    python load_test.py stub [--port 7071] [--latency-ms 20] [--per-service-ms 5] [--error-rate 0]
+"""
+
+import copy
+import http.client
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from common import option
+from diff_extractions import NATURAL_KEYS
+
+
+MAX_SERVICE_CODES = 1000  # ^ID\d{3}$
+
+# Arrays whose items are a fixed set (sizeCode S/M/L); they are never grown
+FIXED_ARRAYS = {"sizeOptions"}
+
+# Per-service array scale factors: most services are typical, some are small or very large
+SIZE_FACTORS = [0.25, 0.5, 1, 1, 1, 2, 4]
+
+ENDPOINTS = {
+    "single": "/services/import",
+    "bulk": "/services/import/bulk",
+}
+
+
+def load_templates(source: Path) -> List[Dict]:
+    """Load extracted outputs (a JSON file or a directory of them) to derive services from."""
+    source = Path(source)
+    files = [source] if source.is_file() else sorted(source.glob("*.json"))
+    templates = []
+    for json_file in files:
+        try:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"   ❌ Skipping {json_file.name}: {e}")
+            continue
+        if isinstance(data, dict) and data.get("serviceName"):
+            templates.append(data)
+    return templates
+
+
+class SyntheticServiceFactory:
+    """Derives distinct services with varied array sizes from real outputs."""
+
+    def __init__(self, templates: List[Dict], seed: int = 42):
+        """
+        Initialize the factory.
+
+        Args:
+            templates: Extracted services used as templates
+            seed: Random seed, so a run can be repeated with the same payloads
+        """
+        if not templates:
+            raise Exception("No extracted outputs to derive services from")
+        self.templates = templates
+        self.rng = random.Random(seed)
+
+    def create(self, number: int, service_code: str) -> Dict:
+        """
+        Create one synthetic service.
+
+        Args:
+            number: Sequence number, used to make names unique
+            service_code: serviceCode of the new service
+
+        Returns:
+            Service document in import format
+        """
+        service = copy.deepcopy(self.templates[number % len(self.templates)])
+        factor = self.rng.choice(SIZE_FACTORS)
+        self._vary(service, factor)
+        service["serviceCode"] = service_code
+        service["serviceName"] = f"{service['serviceName']} (load {number})"
+        return service
+
+    def _vary(self, value, factor: float, key: str = "") -> None:
+        if isinstance(value, dict):
+            for child_key, child in value.items():
+                if isinstance(child, list) and child and child_key not in FIXED_ARRAYS:
+                    # Jitter per array so sizes differ inside one service as well
+                    value[child_key] = self._resize(child, factor * self.rng.uniform(0.75, 1.25))
+                self._vary(value[child_key], factor, child_key)
+        elif isinstance(value, list):
+            for item in value:
+                self._vary(item, factor, key)
+
+    def _resize(self, items: List, factor: float) -> List:
+        target = max(1, round(len(items) * factor))
+        if target <= len(items):
+            return items[:target]
+
+        resized = list(items)
+        for number in range(len(items), target):
+            item = copy.deepcopy(items[number % len(items)])
+            resized.append(self._make_unique(item, number, resized))
+        return resized
+
+    def _make_unique(self, item, number: int, existing: List):
+        """Keep natural keys unique so grown arrays stay importable."""
+        if isinstance(item, str):
+            return f"{item} ({number + 1})"
+        if isinstance(item, dict):
+            for key in NATURAL_KEYS:
+                if key == "serviceCode":
+                    continue  # a dependency reference, not an identity of the item
+                value = item.get(key)
+                if isinstance(value, bool) or value is None:
+                    continue
+                if isinstance(value, int):
+                    item[key] = max((e.get(key, 0) for e in existing if isinstance(e.get(key), int)), default=0) + 1
+                elif isinstance(value, str):
+                    item[key] = f"{value} ({number + 1})"
+        return item
+
+
+class CodeAllocator:
+    """Hands out serviceCodes; the backend rejects codes that already exist."""
+
+    def __init__(self, start: int = 0, reuse: bool = False):
+        self.start = start
+        self.next = start
+        self.reuse = reuse
+
+    def take(self, count: int) -> List[str]:
+        if self.reuse:
+            self.next = self.start
+        if self.next + count > MAX_SERVICE_CODES:
+            raise Exception(f"Out of service codes: {count} more needed, only "
+                            f"{MAX_SERVICE_CODES - self.next} left below ID999. "
+                            f"Lower --services, shorten the sweep or use --reuse-codes")
+        codes = [f"ID{n:03d}" for n in range(self.next, self.next + count)]
+        self.next += count
+        return codes
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 drops connections under high concurrency
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(len(ordered) * p / 100))
+    return ordered[rank - 1]
+
+
+class ImportClient:
+    """HTTP client with one keep-alive connection per thread."""
+
+    def __init__(self, api_url: str, function_key: Optional[str] = None, timeout: float = 300.0):
+        parts = urlsplit(api_url.rstrip('/'))
+        self.scheme = parts.scheme
+        self.host = parts.netloc
+        self.base_path = parts.path
+        self.function_key = function_key
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            connection = cls(self.host, timeout=self.timeout)
+            self._local.connection = connection
+        return connection
+
+    def post(self, endpoint: str, payload) -> Dict:
+        """
+        POST a payload and classify the outcome.
+
+        Returns:
+            Dictionary with status, latency (seconds), services, failed (services
+            rejected) and errors (error category -> count)
+        """
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        headers = {"Content-Type": "application/json"}
+        if self.function_key:
+            headers["x-functions-key"] = self.function_key
+        services = len(payload) if isinstance(payload, list) else 1
+
+        start = time.perf_counter()
+        try:
+            connection = self._connection()
+            connection.request("POST", self.base_path + ENDPOINTS[endpoint], body=body, headers=headers)
+            response = connection.getresponse()
+            data = response.read()
+            status = response.status
+        except Exception as e:
+            # Drop the connection; the next request opens a new one
+            self._local.connection = None
+            return {"status": None, "latency": time.perf_counter() - start, "services": services,
+                    "failed": services, "bytes": len(body), "errors": {type(e).__name__: 1}}
+        latency = time.perf_counter() - start
+
+        errors: Dict[str, int] = {}
+        failed = 0
+        try:
+            result = json.loads(data.decode('utf-8')) if data else {}
+        except ValueError:
+            result = {}
+
+        if endpoint == "bulk" and isinstance(result.get("results"), list):
+            for item in result["results"]:
+                if not item.get("success"):
+                    failed += 1
+                    codes = [e.get("code") for e in item.get("errors") or [] if e.get("code")] or ["rejected"]
+                    errors[codes[0]] = errors.get(codes[0], 0) + 1
+        elif status >= 400:
+            failed = services
+            codes = [e.get("code") for e in result.get("errors") or [] if e.get("code")]
+            category = codes[0] if codes else f"HTTP {status}"
+            errors[category] = services
+
+        return {"status": status, "latency": latency, "services": services,
+                "failed": failed, "bytes": len(body), "errors": errors}
+
+
+def run_step(client: ImportClient, endpoint: str, services: List[Dict], concurrency: int,
+             batch_size: int = 1) -> Dict:
+    """
+    Send services with a fixed concurrency and collect the metrics of one sweep step.
+
+    Returns:
+        Step metrics (throughput, latency percentiles, error rates)
+    """
+    if endpoint == "bulk":
+        payloads = [services[i:i + batch_size] for i in range(0, len(services), batch_size)]
+    else:
+        payloads = services
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda payload: client.post(endpoint, payload), payloads))
+    elapsed = time.perf_counter() - start
+
+    latencies = [r["latency"] * 1000 for r in results]
+    failed_requests = sum(1 for r in results if r["status"] is None or r["status"] >= 400)
+    failed_services = sum(r["failed"] for r in results)
+    errors: Dict[str, int] = {}
+    for r in results:
+        for category, count in r["errors"].items():
+            errors[category] = errors.get(category, 0) + count
+
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "batchSize": batch_size if endpoint == "bulk" else 1,
+        "requests": len(results),
+        "services": len(services),
+        "seconds": round(elapsed, 3),
+        "requestsPerSecond": round(len(results) / elapsed, 2) if elapsed else 0,
+        "servicesPerSecond": round(len(services) / elapsed, 2) if elapsed else 0,
+        "meanPayloadKb": round(sum(r["bytes"] for r in results) / len(results) / 1024, 1) if results else 0,
+        "p50Ms": round(percentile(latencies, 50), 1),
+        "p95Ms": round(percentile(latencies, 95), 1),
+        "p99Ms": round(percentile(latencies, 99), 1),
+        "requestErrorRate": round(failed_requests / len(results), 4) if results else 0,
+        "serviceErrorRate": round(failed_services / len(services), 4) if services else 0,
+        "errors": errors
+    }
+
+
+def print_step(step: Dict) -> None:
+    print(f"   {step['endpoint']:<7}{step['concurrency']:>5}{step['batchSize']:>7}{step['requests']:>7}"
+          f"{step['meanPayloadKb']:>8.0f}{step['requestsPerSecond']:>9.1f}{step['servicesPerSecond']:>10.1f}"
+          f"{step['p50Ms']:>9.1f}{step['p95Ms']:>9.1f}{step['p99Ms']:>9.1f}"
+          f"{step['requestErrorRate']:>9.1%}{step['serviceErrorRate']:>9.1%}")
+    if step["errors"]:
+        details = ", ".join(f"{category} {count}" for category, count in sorted(step["errors"].items()))
+        print(f"          errors: {details}")
+
+
+class StubImportServer:
+    """
+    Local stand-in for the import endpoints, for testing the harness offline.
+
+    Mimics ImportFunction.cs: 200 on success, 400 with DUPLICATE_CODE for
+    known codes, and 200/207/400 bulk responses with per-service results.
+    """
+
+    def __init__(self, port: int = 0, latency_ms: float = 20, per_service_ms: float = 5,
+                 error_rate: float = 0.0):
+        """
+        Initialize the stub.
+
+        Args:
+            port: Port to listen on (0 picks a free port)
+            latency_ms: Base latency per request
+            per_service_ms: Additional latency per imported service
+            error_rate: Share of requests answered with HTTP 500
+        """
+        self.latency_ms = latency_ms
+        self.per_service_ms = per_service_ms
+        self.error_rate = error_rate
+        self.codes = set()
+        self._lock = threading.Lock()
+        self._next_id = 1
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Buffer the response so headers and body leave in one write (flushed after
+            # each request), and skip Nagle: on a keep-alive connection a small second
+            # write otherwise waits for the client's delayed ACK (~40 ms per request)
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                if self.path.endswith("/services/import/health"):
+                    self._reply(200, {"status": "healthy", "service": "Import API (stub)"})
+                else:
+                    self._reply(404, {"success": False, "message": "Not found"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"null")
+                except ValueError:
+                    self._reply(400, {"success": False, "message": "Invalid JSON format"})
+                    return
+                status, body = stub.handle(self.path, payload)
+                self._reply(status, body)
+
+            def _reply(self, status: int, body: Dict):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = _StubHTTPServer(("127.0.0.1", port), Handler)
+        self.port = self.server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}/api"
+
+    def _import(self, service) -> Dict:
+        code = service.get("serviceCode") if isinstance(service, dict) else None
+        if not code or not service.get("serviceName") or not service.get("description"):
+            return {"success": False, "serviceCode": code,
+                    "errors": [{"field": "ServiceCode", "message": "Required field missing", "code": "REQUIRED_FIELD"}]}
+        with self._lock:
+            if code in self.codes:
+                return {"success": False, "serviceCode": code,
+                        "errors": [{"field": "ServiceCode", "message": f"Service with code '{code}' already exists",
+                                    "code": "DUPLICATE_CODE"}]}
+            self.codes.add(code)
+            service_id = self._next_id
+            self._next_id += 1
+        return {"success": True, "serviceId": service_id, "serviceCode": code, "errors": None}
+
+    def handle(self, path: str, payload):
+        """Answer one import request like the backend would."""
+        if random.random() < self.error_rate:
+            return 500, {"success": False, "message": "An unexpected error occurred"}
+
+        if path.endswith("/services/import/bulk"):
+            if not isinstance(payload, list) or not payload:
+                return 400, {"success": False, "message": "Invalid request: No services provided"}
+            time.sleep((self.latency_ms + self.per_service_ms * len(payload)) / 1000)
+            results = [self._import(service) for service in payload]
+            succeeded = sum(1 for r in results if r["success"])
+            status = 200 if succeeded == len(results) else (207 if succeeded else 400)
+            return status, {"totalCount": len(results), "successCount": succeeded,
+                            "failCount": len(results) - succeeded, "results": results}
+
+        if path.endswith("/services/import"):
+            time.sleep((self.latency_ms + self.per_service_ms) / 1000)
+            result = self._import(payload)
+            if result["success"]:
+                return 200, {"success": True, "message": "Service imported successfully",
+                             "serviceId": result["serviceId"], "serviceCode": result["serviceCode"]}
+            return 400, {"success": False, "message": "Service import failed validation", "errors": result["errors"]}
+
+        return 404, {"success": False, "message": "Not found"}
+
+    def start(self) -> None:
+        """Serve in a background thread."""
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def run_sweep() -> None:
+    """Run the concurrency/batch-size sweep described by the command line."""
+    script_dir = Path(__file__).parent
+    source = Path(option('--source', str(script_dir / "output")))
+    count = int(option('--services', "100"))
+    endpoint_option = option('--endpoint', "both")
+    concurrencies = _int_list(option('--concurrency', "1,4,16"))
+    batch_sizes = _int_list(option('--batch-sizes', "10,50"))
+    report_path = option('--report')
+    use_stub = '--stub' in sys.argv
+
+    endpoints = ["single", "bulk"] if endpoint_option == "both" else [endpoint_option]
+    if any(e not in ENDPOINTS for e in endpoints):
+        print(f"❌ Unknown endpoint: {endpoint_option} (use bulk, single or both)")
+        sys.exit(1)
+
+    if not source.exists():
+        print(f"❌ Source not found: {source}")
+        sys.exit(1)
+    templates = load_templates(source)
+    if not templates:
+        print(f"❌ No extracted outputs found in {source}")
+        sys.exit(1)
+
+    steps = [("single", c, 1) for c in concurrencies if "single" in endpoints]
+    steps += [("bulk", c, b) for b in batch_sizes for c in concurrencies if "bulk" in endpoints]
+
+    factory = SyntheticServiceFactory(templates, seed=int(option('--seed', "42")))
+    codes = CodeAllocator(start=int(option('--code-start', "0")), reuse='--reuse-codes' in sys.argv)
+
+    stub = None
+    if use_stub:
+        stub = StubImportServer(latency_ms=float(option('--latency-ms', "20")),
+                                per_service_ms=float(option('--per-service-ms', "5")),
+                                error_rate=float(option('--error-rate', "0")))
+        stub.start()
+        api_url = stub.url
+    else:
+        api_url = option('--api', "http://localhost:7071/api")
+
+    client = ImportClient(api_url, os.environ.get('IMPORT_FUNCTION_KEY'))
+
+    print(f"🏋️  Import API load test")
+    print("=" * 80)
+    print(f"API: {api_url}{' (local stub)' if stub else ''}")
+    print(f"Templates: {len(templates)} extracted output(s) from {source}")
+    print(f"Steps: {len(steps)} x {count} service(s)"
+          f"{' (codes reused)' if codes.reuse else ''}")
+    print("=" * 80)
+    print(f"   {'Endpt':<7}{'Conc':>5}{'Batch':>7}{'Reqs':>7}{'KB/req':>8}{'Req/s':>9}{'Svc/s':>10}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'Req err':>9}{'Svc err':>9}")
+
+    results = []
+    try:
+        for endpoint, concurrency, batch_size in steps:
+            try:
+                step_codes = codes.take(count)
+            except Exception as e:
+                print(f"❌ {str(e)}")
+                break
+            services = [factory.create(n, code) for n, code in enumerate(step_codes)]
+            step = run_step(client, endpoint, services, concurrency, batch_size)
+            results.append(step)
+            print_step(step)
+    finally:
+        if stub:
+            stub.stop()
+    print("=" * 80)
+
+    if report_path:
+        report = {"api": api_url, "stub": bool(stub), "servicesPerStep": count, "steps": results}
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report saved to: {report_path}")
+
+
+def run_stub() -> None:
+    """Serve the stub endpoints until interrupted."""
+    stub = StubImportServer(port=int(option('--port', "7071")),
+                            latency_ms=float(option('--latency-ms', "20")),
+                            per_service_ms=float(option('--per-service-ms', "5")),
+                            error_rate=float(option('--error-rate', "0")))
+    print(f"🧪 Stub import API listening on {stub.url}")
+    print(f"   POST {stub.url}/services/import and {stub.url}/services/import/bulk (Ctrl-C to stop)")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server.server_close()
+
+
+def main():
+    """Main execution."""
+    if len(sys.argv) < 2 or sys.argv[1] not in ("run", "stub"):
+        print(__doc__)
+        sys.exit(1)
+
+    if sys.argv[1] == "stub":
+        run_stub()
+    else:
+        run_sweep()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Catalogue PDF Segmenter
+=======================
+
+Finds service boundaries in PDFs that contain a whole catalogue (dozens of
+services) instead of a single service. Boundaries come from the PDF
+outline (bookmarks) when its entries carry IDnnn codes. On request
+(--split), PDFs without such an outline fall back to IDnnn heading lines
+at the top of pages: a line that starts with the code (or the "ID" field
+label followed by it), not a code mentioned inside text such as
+"Prerequisite: ... (ID002)". Heading segments are only used when they
+cover most of the document. A code that appears again after another
+service started (a cross-reference) does not open a second segment, so
+each serviceCode has exactly one segment. Each segment is written as its
+own PDF so it can be extracted as a separate document.
+
+Requires the optional 'pypdf' package; without it every PDF is treated
+as a single service.
+
+Usage:
+    python pdf_segmenter.py <file.pdf> [--split]
+"""
+
+import io
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # optional dependency, only needed for catalogue PDFs
+    PdfReader = PdfWriter = None
+
+
+SERVICE_CODE = re.compile(r"\bID\s?(\d)\s?(\d)\s?(\d)\b")
+
+# A heading line starts with the code, optionally after the template's "ID" label ("ID ID001")
+HEADING_CODE = re.compile(r"^(?:ID\s+)?ID\s?(\d)\s?(\d)\s?(\d)\b")
+
+# Only the first lines of a page count as a heading
+HEADING_LINES = 8
+
+# Pages with this many heading lines for distinct codes are treated as a table of contents
+TOC_CODE_COUNT = 3
+
+# Heading segments must cover at least this share of the pages, otherwise the
+# codes found are more likely references than service starts
+HEADING_COVERAGE = 0.75
+
+
+def segmentation_available() -> bool:
+    """Check whether the optional PDF library is installed."""
+    return PdfReader is not None
+
+
+def _code(match: re.Match) -> str:
+    return "ID" + "".join(match.groups())
+
+
+class PdfSegmenter:
+    """Splits a catalogue PDF into per-service page ranges."""
+
+    def __init__(self, pdf_path: Path):
+        """
+        Open a PDF for segmentation.
+
+        Args:
+            pdf_path: Path to the PDF file
+        """
+        if not segmentation_available():
+            raise Exception("PDF segmentation requires the 'pypdf' package (pip install pypdf)")
+        self.pdf_path = Path(pdf_path)
+        self.reader = PdfReader(str(self.pdf_path))
+        self.page_count = len(self.reader.pages)
+        # (page, serviceCode) of repeated codes folded into the surrounding segment
+        self.repeated: List[tuple] = []
+
+    def find_segments(self, headings: bool = False) -> List[Dict]:
+        """
+        Find service segments.
+
+        Args:
+            headings: Fall back to IDnnn heading lines when the outline has no service codes
+
+        Returns:
+            List of segments with serviceCode, title, start/end page (0-based,
+            end exclusive) and source ('outline' or 'headings'). Fewer than two
+            segments means the PDF holds a single service.
+        """
+        segments = self._segments_from_outline()
+        if len(segments) < 2 and headings:
+            segments = self._segments_from_headings()
+        return segments if len(segments) >= 2 else []
+
+    def _segments_from_outline(self) -> List[Dict]:
+        try:
+            outline = self.reader.outline
+        except Exception:
+            return []
+
+        starts = []
+        for item in self._flatten(outline):
+            title = getattr(item, "title", "") or ""
+            match = SERVICE_CODE.search(title)
+            if not match:
+                continue
+            try:
+                page = self.reader.get_destination_page_number(item)
+            except Exception:
+                continue
+            if page is not None and page >= 0:
+                starts.append((page, _code(match), title.strip()))
+
+        return self._to_segments(starts, "outline")
+
+    def _flatten(self, outline) -> List:
+        items = []
+        for entry in outline or []:
+            if isinstance(entry, list):
+                items.extend(self._flatten(entry))
+            else:
+                items.append(entry)
+        return items
+
+    def _segments_from_headings(self) -> List[Dict]:
+        starts = []
+        current = None
+        for number, page in enumerate(self.reader.pages):
+            try:
+                text = page.extract_text() or ""
+            except Exception:
+                continue
+
+            lines = [line.strip() for line in text.splitlines() if line.strip()]
+            if len({_code(m) for m in map(HEADING_CODE.match, lines) if m}) >= TOC_CODE_COUNT:
+                continue
+
+            lines = lines[:HEADING_LINES]
+            for i, line in enumerate(lines):
+                match = HEADING_CODE.match(line)
+                if not match:
+                    continue
+                code = _code(match)
+                if code != current:
+                    # The heading line is usually the service name, the code is on its own line
+                    title = lines[i - 1] if i > 0 and not HEADING_CODE.match(lines[i - 1]) else line
+                    starts.append((number, code, title))
+                    current = code
+                break
+
+        segments = self._to_segments(starts, "headings")
+        covered = sum(s["end"] - s["start"] for s in segments)
+        if covered < self.page_count * HEADING_COVERAGE:
+            return []
+        return segments
+
+    def _to_segments(self, starts: List[tuple], source: str) -> List[Dict]:
+        # A code seen again after another service started is a cross-reference
+        # ("see ID002"), not a second section: its pages stay with the current
+        # segment, so every serviceCode maps to exactly one segment and output
+        starts = sorted(set(starts))
+        segments = []
+        self.repeated = []
+        for i, (page, code, title) in enumerate(starts):
+            end = starts[i + 1][0] if i + 1 < len(starts) else self.page_count
+            if segments and segments[-1]["serviceCode"] == code:
+                segments[-1]["end"] = max(segments[-1]["end"], end)
+                continue
+            if any(s["serviceCode"] == code for s in segments):
+                self.repeated.append((page, code))
+                if segments:
+                    segments[-1]["end"] = max(segments[-1]["end"], end)
+                continue
+            if end <= page:
+                continue
+            segments.append({"serviceCode": code, "title": title, "start": page, "end": end, "source": source})
+        return segments
+
+    def write_segment(self, segment: Dict) -> bytes:
+        """Write a segment's pages into a standalone PDF."""
+        writer = PdfWriter()
+        for number in range(segment["start"], segment["end"]):
+            writer.add_page(self.reader.pages[number])
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        return buffer.getvalue()
+
+
+def find_segments(pdf_path: Path, headings: bool = False) -> Optional[List[Dict]]:
+    """Segments of a catalogue PDF, [] for single-service PDFs, None if unavailable."""
+    if not segmentation_available():
+        return None
+    try:
+        return PdfSegmenter(pdf_path).find_segments(headings)
+    except Exception as e:
+        print(f"⚠️  Segmentation skipped for {Path(pdf_path).name}: {str(e)}")
+        return []
+
+
+def main():
+    """Print the segments found in a PDF."""
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    pdf_path = Path(sys.argv[1])
+    if not pdf_path.exists():
+        print(f"❌ PDF not found: {pdf_path}")
+        sys.exit(1)
+
+    if not segmentation_available():
+        print("❌ PDF segmentation requires the 'pypdf' package (pip install pypdf)")
+        sys.exit(1)
+
+    segmenter = PdfSegmenter(pdf_path)
+    segments = segmenter.find_segments(headings='--split' in sys.argv)
+    print(f"📄 {pdf_path.name}: {segmenter.page_count} page(s)")
+    if not segments:
+        print("   Single-service document (no service boundaries found)")
+        if '--split' not in sys.argv:
+            print("   Pass --split to also look for IDnnn heading lines when the outline has no codes")
+        return
+
+    print(f"📚 {len(segments)} service(s) found via {segments[0]['source']}:")
+    for segment in segments:
+        print(f"   {segment['serviceCode']}  pages {segment['start'] + 1}-{segment['end']}  {segment['title']}")
+    for page, code in segmenter.repeated:
+        print(f"   ↪ {code} repeated on page {page + 1}: treated as a cross-reference")
+
+
+if __name__ == "__main__":
+    main()
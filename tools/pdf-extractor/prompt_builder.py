@@ -0,0 +1,465 @@
+"""
+Schema-Derived Extraction Prompt
+================================
+
+Builds the extraction prompt from the loaded import schema instead of
+repeating the schema in hand-maintained prose. The structural part is a
+compact outline generated from schemas/service-import-schema.json; the
+hand-written guidance only covers what the schema cannot express.
+
+Prompts are memoized per schema hash, so the outline is generated once
+per schema version.
+
+Usage:
+    python prompt_builder.py [--api] [--show]
+
+    --api   Count tokens with the Anthropic API (needs ANTHROPIC_API_KEY)
+    --show  Print the generated prompt
+"""
+
+import hashlib
+import json
+import math
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from schema_normalizer import resolve_ref
+
+
+PROMPT_HEADER = """You are extracting structured data from a Service Catalogue PDF document.
+Extract ALL information from the PDF into one JSON object that matches the schema below."""
+
+# Tool-use mode sends no outline; the schema is the tool's input_schema
+TOOL_USE_HEADER = """You are extracting structured data from a Service Catalogue PDF document.
+Extract ALL information from the PDF into one object that matches the input schema of the provided tool."""
+
+OUTLINE_LEGEND = """Schema notation: key* = required, [T] = array of T, "A"|"B" = enum, /re/ = pattern, = default, // note; named types are defined under "where"."""
+
+# Guidance the schema cannot express (document conventions, extraction policy, output format)
+EXTRACTION_GUIDANCE = """Rules:
+1. serviceCode: the ACTUAL code from the document (headers, footers, title page), e.g. "ID001". Never a placeholder such as "ID0XX" or "IDXXX"; use "ID999" only if no code appears anywhere.
+2. Preserve ALL details - do not summarize. Keep original numbers (hours, days, FTE allocations), hierarchies (categories → items), numbering and order (sortOrder).
+3. Extract every usage scenario, scope category, prerequisite, input parameter, output category, timeline phase, size option (typically S/M/L), example and characteristic.
+4. Dependencies: group into prerequisite / triggersFor / parallelWith; include serviceCode only if the document names it.
+5. Tools are objects, never plain strings; use "" for an unknown version or purpose.
+6. Enum fields take the exact enum value, never descriptive text (involvementLevel "REQUIRED", not "Must attend all workshops").
+7. teamSize is text such as "2-3 people"; isPrimaryOwner is true only for the primary owner role.
+8. Missing data: null for optional values, [] for arrays, {} for objects.
+
+Output ONLY the JSON object: no markdown code fences, no explanations; start with { and end with }."""
+
+TOOL_USE_GUIDANCE = """Record the result by calling the provided tool exactly once; its input schema is the import schema."""
+
+# Hand-written prompt used before the schema-derived prompt; kept for the token report
+LEGACY_EXTRACTION_PROMPT = """You are extracting structured data from a Service Catalogue PDF document.
+
+**Task:** Extract ALL information from the PDF and structure it as JSON according to the provided schema.
+
+**JSON Schema Reference:**
+The output must conform to the service import JSON schema with the following structure:
+- serviceCode (required, pattern: ID0XX)
+- serviceName (required)
+- version (default: v1.0)
+- category (required)
+- description (required)
+- notes (optional)
+- usageScenarios (array of scenarios with scenarioNumber, scenarioTitle, scenarioDescription)
+- dependencies (object with prerequisite, triggersFor, parallelWith arrays)
+- scope (object with inScope and outOfScope)
+- prerequisites (organizational, technical, documentation)
+- toolsAndEnvironment (cloudPlatforms, designTools, automationTools, etc.)
+- licenses (requiredByCustomer, recommendedOptional, providedByServiceProvider)
+- stakeholderInteraction (interactionLevel, customerMustProvide, workshopParticipation, accessRequirements)
+- serviceInputs (array of parameters with requirementLevel)
+- serviceOutputs (array of output categories with items)
+- timeline (phases array)
+- sizeOptions (array with S/M/L sizing, effort breakdown, complexity additions, team allocation, examples)
+- responsibleRoles (array of roles)
+- multiCloudConsiderations (array of considerations)
+
+**Critical Instructions:**
+
+1. **Service Code & Basic Info:**
+   - Extract the ID code from the PDF (e.g., ID001, ID002, ID003, etc.)
+   - IMPORTANT: serviceCode MUST be exactly 5 characters: ID followed by 3 digits (pattern: ^ID[0-9]{3}$)
+   - NEVER use placeholder like "ID0XX" or "IDXXX" - extract the ACTUAL service code from the document
+   - If no service code is visible in the PDF, look for it in headers, footers, or title pages
+   - If truly not found, use ID999 as a last resort (but this should be rare)
+   - Extract full service name
+   - Extract version (default to v1.0 if not specified)
+   - Extract category path (e.g., "Services/Architecture/Technical Architecture")
+   - Extract complete description
+
+2. **Usage Scenarios:**
+   - Extract ALL numbered scenarios (typically 6-8)
+   - Include scenarioNumber, scenarioTitle, and full scenarioDescription
+   - Preserve order with sortOrder
+
+3. **Dependencies:**
+   - Group into three types: prerequisite, triggersFor, parallelWith
+   - For each dependency include: serviceName, serviceCode (if mentioned), requirementLevel (REQUIRED/RECOMMENDED/OPTIONAL)
+
+4. **Scope:**
+   - In-scope: Extract all numbered categories with their items
+   - Each category should have categoryName, categoryNumber (if numbered), and items array
+   - Out-of-scope: Extract all bullet points as simple strings
+
+5. **Prerequisites:**
+   - Group by category: organizational, technical, documentation
+   - For each prerequisite: name, description, requirementLevel
+
+6. **Tools and Environment:**
+   - Group by category: cloudPlatforms, designTools, automationTools, collaborationTools
+   - CRITICAL: Each tool MUST be an object with these properties:
+     * category: string (e.g., "Diagramming", "IaC", "Collaboration")
+     * toolName: string (name of the tool)
+     * version: string (version if specified, empty string if not)
+     * purpose: string (description of what the tool is used for)
+   - NEVER use simple strings - ALWAYS use objects
+   - Example: { "category": "Diagramming", "toolName": "Visio", "version": "", "purpose": "Architecture diagrams" }
+
+7. **Licenses:**
+   - Group into: requiredByCustomer, recommendedOptional, providedByServiceProvider
+   - For each: licenseName, licenseType, description
+
+8. **Stakeholder Interaction:**
+   - Extract interactionLevel (LOW/MEDIUM/HIGH)
+   - Extract "Customer Must Provide" list as array of STRINGS (NOT objects)
+     * Each item should be a simple string describing what customer must provide
+     * Example: ["Azure subscription access", "Business requirements documentation", "Stakeholder availability"]
+   - Extract workshop participation as array of OBJECTS with:
+     * roleName: string (e.g., "Solutions Architect", "Business Analyst")
+     * involvementLevel: ENUM - MUST be one of: REQUIRED, RECOMMENDED, OPTIONAL, AS_NEEDED
+     * CRITICAL: involvementLevel must be EXACT enum value, NOT descriptive text
+     * Example: { "roleName": "Solutions Architect", "involvementLevel": "REQUIRED" }
+   - Extract access requirements as array of OBJECTS (NOT strings):
+     * Each access requirement MUST be an object with:
+       - requirementType: string (e.g., "Azure Subscription", "Network Access")
+       - description: string (detailed description)
+       - isMandatory: boolean (true/false)
+     * Example: { "requirementType": "Network Access", "description": "VPN or ExpressRoute", "isMandatory": true }
+
+9. **Service Inputs:**
+   - Extract ALL input parameters
+   - Include: parameterName, description, requirementLevel (REQUIRED/RECOMMENDED/OPTIONAL)
+   - Include dataType, defaultValue, exampleValue if mentioned
+
+10. **Service Outputs:**
+    - Extract all numbered output categories
+    - For each category: categoryName, categoryNumber, items array
+    - Each item should have itemName and itemDescription
+
+11. **Timeline:**
+    - IMPORTANT: Timeline is an OBJECT with a "phases" property (not a direct array)
+    - Structure: { "phases": [ phase1, phase2, ... ] }
+    - Extract all phases with phaseNumber, phaseName, description
+    - Include durationBySize (small, medium, large) if provided
+    - Example: { "phases": [{ "phaseNumber": 1, "phaseName": "Discovery", ... }] }
+
+12. **Size Options (CRITICAL - Most Complex Section):**
+    - Extract ALL size options (S, M, L, typically 3)
+    - For EACH size option extract:
+      a) Basic info: sizeCode, description, duration, durationInDays
+      b) Effort: hours (or hoursMin/hoursMax range), currency
+      c) teamSize (STRING, e.g. "2-3 people", "4-5 FTE"), complexity (LOW/MEDIUM/HIGH)
+      d) sizingCriteria: array of criteria with criteriaName and values
+      e) effortBreakdown: array with scopeArea, baseHours, notes
+      f) complexityAdditions: array with factor, condition, additionalHours
+      g) teamAllocation: array with role, allocation (FTE), notes
+      h) examples: array with exampleName, scenario, description, characteristics (name/value pairs), deliverables
+      i) scopeDependencies: array with scopeArea and requires array
+      j) sizingParameters: array with parameterName, parameterType (SCALE/TECHNICAL), description, values
+
+13. **Responsible Roles:**
+    - Extract all roles
+    - For each: roleName, isPrimaryOwner (true for primary, false otherwise), responsibilities
+
+14. **Multi-Cloud Considerations:**
+    - Extract all considerations as array
+    - Each with: considerationTitle, description
+
+**Output Format:**
+- Return ONLY valid JSON
+- No markdown code blocks (no ```json)
+- No explanations or preamble
+- Start directly with { and end with }
+- Use null for missing optional fields
+- Use empty arrays [] for missing array fields
+- Ensure all required fields are present
+
+**CRITICAL: Service Code Validation:**
+- serviceCode must match pattern: ^ID[0-9]{3}$
+- VALID examples: "ID001", "ID002", "ID123"
+- INVALID examples: "ID0XX", "IDXXX", "ID01", "ID1234"
+- Extract the ACTUAL service code from the PDF - look in headers, title, first page
+- If not found in PDF, use "ID999" but this should be VERY RARE
+
+**Data Type Rules:**
+- Strings: Use quotes
+- Numbers: No quotes (e.g., 160, 240, 0.5)
+- Booleans: true or false (no quotes)
+- Arrays: Use [] even if empty
+- Objects: Use {} even if empty
+- Enums: Use exact values (REQUIRED, RECOMMENDED, OPTIONAL, LOW, MEDIUM, HIGH, S, M, L)
+
+**Quality Checks:**
+- Preserve ALL details - do not summarize
+- Maintain exact hierarchies (categories → items)
+- Keep original numbers (hours, days, FTE allocations)
+- Extract ALL examples for each size option
+- Include ALL characteristics for each example
+
+Begin extraction now. Return only the JSON object:"""
+
+_PROMPT_CACHE: Dict[str, str] = {}
+
+
+def schema_hash(schema: Dict) -> str:
+    """Stable hash of a schema (key order independent)."""
+    canonical = json.dumps(schema, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class SchemaOutline:
+    """Renders a JSON schema as a compact, indented type outline."""
+
+    # Objects with at most this many scalar properties are rendered on one line
+    INLINE_PROPERTIES = 6
+    MAX_NOTE_LENGTH = 80
+
+    def __init__(self, schema: Dict):
+        self.schema = schema
+        # Object definitions referenced more than once are rendered once, by name
+        self.shared = {ref for ref, count in self._count_refs(schema).items()
+                       if count > 1 and not self._is_scalar(self._resolve({"$ref": ref}))}
+
+    def render(self) -> str:
+        lines: List[str] = []
+        self._properties(self._resolve(self.schema), 0, lines, set())
+        if self.shared:
+            lines.append("")
+            lines.append("where")
+            for ref in sorted(self.shared):
+                rendered, block = self._type(self._resolve({"$ref": ref}), 0, {ref})
+                lines.append(f"{self._ref_name(ref)} = {rendered}")
+                lines.extend(block)
+        return "\n".join(lines)
+
+    @staticmethod
+    def _ref_name(ref: str) -> str:
+        return ref.rsplit("/", 1)[-1]
+
+    def _count_refs(self, node, counts: Dict[str, int] = None) -> Dict[str, int]:
+        counts = {} if counts is None else counts
+        if isinstance(node, dict):
+            if isinstance(node.get("$ref"), str):
+                counts[node["$ref"]] = counts.get(node["$ref"], 0) + 1
+            for value in node.values():
+                self._count_refs(value, counts)
+        elif isinstance(node, list):
+            for value in node:
+                self._count_refs(value, counts)
+        return counts
+
+    def _resolve(self, definition: Dict) -> Dict:
+        seen = 0
+        while isinstance(definition, dict) and "$ref" in definition and seen < 32:
+            definition = resolve_ref(self.schema, definition["$ref"])
+            seen += 1
+        if not isinstance(definition, dict):
+            return {}
+
+        # Merge allOf parts; anyOf/oneOf are rendered as alternatives in _type
+        if "allOf" in definition:
+            merged = {k: v for k, v in definition.items() if k != "allOf"}
+            for part in definition["allOf"]:
+                part = self._resolve(part)
+                merged.setdefault("properties", {}).update(part.get("properties", {}))
+                merged["required"] = merged.get("required", []) + part.get("required", [])
+                for key in ("type", "enum", "items", "pattern"):
+                    if key in part and key not in merged:
+                        merged[key] = part[key]
+            definition = merged
+        return definition
+
+    def _properties(self, definition: Dict, depth: int, lines: List[str], stack: set) -> None:
+        required = set(definition.get("required", []))
+        indent = "  " * depth
+        for name, prop in definition.get("properties", {}).items():
+            marker = "*" if name in required else ""
+            rendered, block = self._type(prop, depth, stack)
+            note = self._note(self._resolve(prop))
+            lines.append(f"{indent}{name}{marker}: {rendered}{note}")
+            lines.extend(block)
+
+    def _type(self, prop: Dict, depth: int, stack: set):
+        """Return (inline text, extra lines for multi-line objects)."""
+        ref = prop.get("$ref") if isinstance(prop, dict) else None
+        definition = self._resolve(prop)
+
+        if ref and (ref in stack or ref in self.shared):
+            return self._ref_name(ref), []
+
+        if "enum" in definition:
+            return "|".join(json.dumps(v, ensure_ascii=False) for v in definition["enum"]), []
+
+        for combinator in ("anyOf", "oneOf"):
+            if combinator in definition:
+                variants = [self._type(v, depth, stack)[0] for v in definition[combinator]]
+                return " | ".join(variants), []
+
+        declared = definition.get("type")
+        types = declared if isinstance(declared, list) else [declared] if declared else []
+        non_null = [t for t in types if t != "null"]
+        nullable = "|null" if "null" in types and non_null else ""
+        kind = non_null[0] if non_null else ("object" if "properties" in definition else None)
+
+        inner_stack = stack | {ref} if ref else stack
+
+        if kind == "array":
+            items = definition.get("items", {})
+            item_text, block = self._type(items, depth, inner_stack)
+            if block:
+                return "[" + item_text, block[:-1] + [block[-1] + "]" + nullable]
+            return f"[{item_text}]{nullable}", []
+
+        if kind == "object" and "properties" in definition:
+            properties = definition["properties"]
+            scalar = all(self._is_scalar(self._resolve(p)) for p in properties.values())
+            if scalar and len(properties) <= self.INLINE_PROPERTIES:
+                required = set(definition.get("required", []))
+                parts = [f"{n}{'*' if n in required else ''}: {self._type(p, depth, inner_stack)[0]}"
+                         for n, p in properties.items()]
+                return "{" + ", ".join(parts) + "}" + nullable, []
+            block: List[str] = []
+            self._properties(definition, depth + 1, block, inner_stack)
+            return "{", block + ["  " * depth + "}" + nullable]
+
+        if kind == "object" and isinstance(definition.get("additionalProperties"), dict):
+            value_text, block = self._type(definition["additionalProperties"], depth, inner_stack)
+            if block:
+                return "{<key>: " + value_text, block[:-1] + [block[-1] + "}" + nullable]
+            return "{<key>: " + value_text + "}" + nullable, []
+
+        if kind == "object":
+            return "object" + nullable, []
+
+        text = (kind or "any") + nullable
+        if "pattern" in definition:
+            text += f" /{definition['pattern']}/"
+        if "default" in definition:
+            text += f" = {json.dumps(definition['default'], ensure_ascii=False)}"
+        return text, []
+
+    @staticmethod
+    def _is_scalar(definition: Dict) -> bool:
+        declared = definition.get("type")
+        types = declared if isinstance(declared, list) else [declared]
+        return "enum" in definition or not any(t in ("object", "array") for t in types)
+
+    def _note(self, definition: Dict) -> str:
+        description = (definition.get("description") or "").strip()
+        if not description:
+            return ""
+        first_sentence = description.split(". ")[0].rstrip(".")
+        if len(first_sentence) > self.MAX_NOTE_LENGTH:
+            first_sentence = first_sentence[:self.MAX_NOTE_LENGTH - 1] + "…"
+        return f"  // {first_sentence}"
+
+
+def build_extraction_prompt(schema: Dict, tool_use: bool = False) -> str:
+    """
+    Build (or return the memoized) extraction prompt for a schema.
+
+    Args:
+        schema: Loaded import schema
+        tool_use: The schema is passed as a tool input_schema, so the outline
+                  and output-format instructions are omitted
+
+    Returns:
+        Prompt text
+    """
+    key = f"{schema_hash(schema)}:{'tool' if tool_use else 'text'}"
+    if key not in _PROMPT_CACHE:
+        if tool_use:
+            guidance = EXTRACTION_GUIDANCE.rsplit("\n\n", 1)[0]
+            _PROMPT_CACHE[key] = "\n\n".join([TOOL_USE_HEADER, guidance, TOOL_USE_GUIDANCE])
+        else:
+            outline = SchemaOutline(schema).render()
+            _PROMPT_CACHE[key] = "\n\n".join([PROMPT_HEADER, OUTLINE_LEGEND, outline, EXTRACTION_GUIDANCE])
+    return _PROMPT_CACHE[key]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about 4 characters per token for English/JSON text)."""
+    return math.ceil(len(text) / 4)
+
+
+def count_tokens(client, model: str, text: str) -> Optional[int]:
+    """Exact input token count via the API, or None if unavailable."""
+    messages = [{"role": "user", "content": text}]
+    for counter in (getattr(client, "messages", None), getattr(getattr(client, "beta", None), "messages", None)):
+        if counter is None or not hasattr(counter, "count_tokens"):
+            continue
+        try:
+            return counter.count_tokens(model=model, messages=messages).input_tokens
+        except Exception:
+            continue
+    return None
+
+
+def main():
+    """Print a token report comparing the legacy and the schema-derived prompt."""
+    script_dir = Path(__file__).parent
+    schema_path = script_dir.parent.parent / "schemas" / "service-import-schema.json"
+
+    if not schema_path.exists():
+        print(f"❌ Schema not found: {schema_path}")
+        sys.exit(1)
+
+    with open(schema_path, 'r', encoding='utf-8') as f:
+        schema = json.load(f)
+
+    prompts = {
+        "Legacy (hand-written)": LEGACY_EXTRACTION_PROMPT,
+        "Schema-derived": build_extraction_prompt(schema),
+        "Schema-derived (tool use)": build_extraction_prompt(schema, tool_use=True),
+    }
+
+    client = None
+    model = os.environ.get('CLAUDE_MODEL', "claude-sonnet-4-20250514")
+    if '--api' in sys.argv:
+        api_key = os.environ.get('ANTHROPIC_API_KEY')
+        if not api_key:
+            print("❌ Error: ANTHROPIC_API_KEY environment variable not set")
+            sys.exit(1)
+        import anthropic
+        client = anthropic.Anthropic(api_key=api_key)
+
+    print("📏 Extraction Prompt Token Report")
+    print("=" * 80)
+    print(f"Schema: {schema_path.name} (hash {schema_hash(schema)[:12]})")
+    print(f"{'Prompt':<30}{'Chars':>10}{'≈Tokens':>10}{'API tokens':>12}{'vs legacy':>12}")
+    print("-" * 80)
+
+    baseline = None
+    for name, text in prompts.items():
+        tokens = count_tokens(client, model, text) if client else None
+        measured = tokens if tokens is not None else estimate_tokens(text)
+        baseline = baseline or measured
+        change = f"{(measured - baseline) / baseline * 100:+.1f}%"
+        api_text = str(tokens) if tokens is not None else "-"
+        print(f"{name:<30}{len(text):>10}{estimate_tokens(text):>10}{api_text:>12}{change:>12}")
+
+    print("=" * 80)
+    print("Note: the PDF document itself dominates input tokens; the prompt is sent with every call.")
+
+    if '--show' in sys.argv:
+        print()
+        print(prompts["Schema-derived"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Extraction Run Journal
+======================
+
+Write-ahead journal of per-file states for extract_services.py, so an
+interrupted batch run (Ctrl-C, timeout, machine restart) can continue
+with --resume instead of starting from scratch.
+
+Every state change is appended as one JSON line and fsync'ed before the
+work it describes starts (in_flight) or after its output was written
+atomically (done). Replaying the journal gives the last known state of
+each file; anything still in_flight was interrupted and is queued again.
+
+Catalogue PDFs that are split into per-service segments journal each
+segment under "<file>#<serviceCode>", so a resumed run only re-extracts
+the segments that did not finish.
+"""
+
+import json
+import os
+import signal
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+JOURNAL_FILE = ".extraction-journal"
+
+QUEUED = "queued"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+
+
+class RunJournal:
+    """Append-only journal of extraction states keyed by PDF file name."""
+
+    def __init__(self, output_dir: Path, resume: bool = False):
+        """
+        Open the journal.
+
+        Args:
+            output_dir: Directory holding the journal and output files
+            resume: Keep and replay an existing journal instead of starting a new run
+        """
+        self.path = Path(output_dir) / JOURNAL_FILE
+        self.states: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+        if resume and self.path.exists():
+            self._replay()
+        elif self.path.exists():
+            self.path.unlink()
+
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if self.path.stat().st_size and not self._ends_with_newline():
+            # Terminate a torn last line so the next record starts cleanly
+            self._file.write("\n")
+
+    def _replay(self) -> None:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash mid-append is ignored
+                    continue
+                self.states[record["file"]] = record
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _append(self, *records: Dict) -> None:
+        timestamp = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            for record in records:
+                record["ts"] = timestamp
+                self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                self.states[record["file"]] = record
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    @staticmethod
+    def _fingerprint(pdf_path: Path) -> Dict:
+        stat = pdf_path.stat()
+        return {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+    @staticmethod
+    def _key(pdf_path: Path, part: Optional[str] = None) -> str:
+        return f"{pdf_path.name}#{part}" if part else pdf_path.name
+
+    def state(self, pdf_path: Path, part: Optional[str] = None) -> Optional[str]:
+        """Last journaled state of a PDF or one of its segments (None if unknown)."""
+        record = self.states.get(self._key(pdf_path, part))
+        return record["state"] if record else None
+
+    def is_done(self, pdf_path: Path, part: Optional[str] = None) -> bool:
+        """
+        Check whether a PDF (or a segment of it) was completed by a previous run.
+
+        The PDF must be unchanged and its outputs must still exist.
+        """
+        record = self.states.get(self._key(pdf_path, part))
+        if not record or record["state"] != DONE:
+            return False
+        if record.get("source") != self._fingerprint(pdf_path):
+            return False
+        return all(Path(p).exists() for p in record.get("outputs", []))
+
+    def pending(self, pdf_files: List[Path]) -> List[Path]:
+        """Filter out files already done; interrupted and failed files are retried."""
+        return [p for p in pdf_files if not self.is_done(p)]
+
+    def done_outputs(self, pdf_files: List[Path]) -> List[Path]:
+        """
+        Outputs of the given files and their segments that is_done() accepts (each once).
+
+        Records of PDFs that changed since, or whose outputs are gone, are left out.
+        """
+        outputs = {}
+        for pdf_path in pdf_files:
+            prefix = self._key(pdf_path) + "#"
+            parts = [None] + [key[len(prefix):] for key in self.states if key.startswith(prefix)]
+            for part in parts:
+                if self.is_done(pdf_path, part):
+                    for p in self.states[self._key(pdf_path, part)].get("outputs", []):
+                        outputs[Path(p)] = True
+        return list(outputs)
+
+    def mark_queued(self, pdf_files: List[Path]) -> None:
+        self._append(*({"file": p.name, "state": QUEUED} for p in pdf_files))
+
+    def mark_in_flight(self, pdf_path: Path, part: Optional[str] = None) -> None:
+        self._append({"file": self._key(pdf_path, part), "state": IN_FLIGHT})
+
+    def mark_done(self, pdf_path: Path, outputs: List[Path], part: Optional[str] = None) -> None:
+        self._append({
+            "file": self._key(pdf_path, part),
+            "state": DONE,
+            "source": self._fingerprint(pdf_path),
+            # Resolved, so the journal stays valid when the next run starts elsewhere
+            "outputs": [str(Path(p).resolve()) for p in outputs]
+        })
+
+    def mark_failed(self, pdf_path: Path, error: str = "", part: Optional[str] = None) -> None:
+        self._append({"file": self._key(pdf_path, part), "state": FAILED, "error": error[:500]})
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class GracefulInterrupt:
+    """
+    Turns the first Ctrl-C (or SIGTERM) into a stop request, so in-flight
+    work can finish. A second signal aborts immediately.
+    """
+
+    SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+    def __init__(self):
+        self.stop_requested = False
+        self._previous = {}
+
+    def __enter__(self):
+        for sig in self.SIGNALS:
+            self._previous[sig] = signal.signal(sig, self._handle)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for sig, handler in self._previous.items():
+            signal.signal(sig, handler)
+        return False
+
+    def _handle(self, signum, frame):
+        if self.stop_requested:
+            raise KeyboardInterrupt
+        self.stop_requested = True
+        print("\n⏸️  Interrupt received - finishing in-flight work, then stopping.")
+        print("   Press Ctrl-C again to abort immediately. Continue later with --resume")
@@ -0,0 +1,472 @@
+"""
+Schema-Driven Normalizer for PDF Extractions
+============================================
+
+Applies declarative normalization rules (normalization_rules.json) to
+extracted service data in a single traversal guided by the compiled
+import schema. Fixes the type mismatches reported by SchemaAnalyzer
+(integer teamSize, string responsibilities, descriptive involvementLevel,
+string tool entries, ...) locally instead of re-running the extraction.
+
+Usage:
+    python schema_normalizer.py [output_dir] [--dry-run]
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from common import atomic_write
+
+
+DEFAULT_RULES_PATH = Path(__file__).parent / "normalization_rules.json"
+
+# 'after' of a change record that only reports a value for review
+UNCHANGED = "(unchanged)"
+
+_PLACEHOLDER = re.compile(r"\{([^{}|]+)(?:\|([^{}]*))?\}")
+
+
+class SchemaNode:
+    """A schema definition with $ref/allOf/anyOf/oneOf resolved."""
+
+    __slots__ = ("types", "enum", "properties", "additional", "items", "required")
+
+    def __init__(self):
+        self.types: List[str] = []
+        self.enum: Optional[List] = None
+        self.properties: Dict[str, "SchemaNode"] = {}
+        self.additional: Optional["SchemaNode"] = None
+        self.items: Optional["SchemaNode"] = None
+        self.required: List[str] = []
+
+    def accepts_type(self, json_type: str) -> bool:
+        """Check whether a JSON type is allowed by this node."""
+        if not self.types:
+            return True
+        if json_type in self.types:
+            return True
+        return json_type == "integer" and "number" in self.types
+
+
+def resolve_ref(schema: Dict, ref: str) -> Dict:
+    """Resolve a local JSON pointer reference such as '#/definitions/toolItem'."""
+    if not ref.startswith("#/"):
+        return {}
+    target = schema
+    for part in ref[2:].split("/"):
+        part = part.replace("~1", "/").replace("~0", "~")
+        if not isinstance(target, dict) or part not in target:
+            return {}
+        target = target[part]
+    return target
+
+
+def compile_schema(schema: Dict) -> SchemaNode:
+    """
+    Compile a JSON schema into a tree of SchemaNode objects.
+
+    References are resolved once, so normalization does not have to walk
+    definitions for every value. Recursive references share nodes.
+    """
+    cache: Dict[int, SchemaNode] = {}
+
+    def build(definition: Dict) -> SchemaNode:
+        while isinstance(definition, dict) and "$ref" in definition:
+            definition = resolve_ref(schema, definition["$ref"])
+        if not isinstance(definition, dict):
+            return SchemaNode()
+
+        key = id(definition)
+        if key in cache:
+            return cache[key]
+
+        node = SchemaNode()
+        cache[key] = node
+        merge(node, definition)
+        return node
+
+    def merge(node: SchemaNode, definition: Dict) -> None:
+        while "$ref" in definition:
+            definition = resolve_ref(schema, definition["$ref"])
+
+        declared = definition.get("type")
+        if isinstance(declared, list):
+            node.types.extend(t for t in declared if t not in node.types)
+        elif declared and declared not in node.types:
+            node.types.append(declared)
+
+        if "enum" in definition:
+            node.enum = list(definition["enum"])
+
+        for name, prop in definition.get("properties", {}).items():
+            if name not in node.properties:
+                node.properties[name] = build(prop)
+
+        additional = definition.get("additionalProperties")
+        if isinstance(additional, dict) and node.additional is None:
+            node.additional = build(additional)
+
+        if isinstance(definition.get("items"), dict) and node.items is None:
+            node.items = build(definition["items"])
+
+        node.required.extend(r for r in definition.get("required", []) if r not in node.required)
+
+        for combinator in ("allOf", "anyOf", "oneOf"):
+            for sub in definition.get(combinator, []):
+                if isinstance(sub, dict):
+                    merge(node, sub)
+
+    return build(schema)
+
+
+def json_type(value) -> str:
+    """Get JSON schema type name for Python value."""
+    type_map = {
+        str: 'string',
+        int: 'integer',
+        float: 'number',
+        bool: 'boolean',
+        list: 'array',
+        dict: 'object',
+        type(None): 'null'
+    }
+    return type_map.get(type(value), 'unknown')
+
+
+class SchemaNormalizer:
+    """Applies normalization rules to extracted data using the import schema."""
+
+    def __init__(self, schema: Dict, rules_path: Path = DEFAULT_RULES_PATH):
+        """
+        Initialize the normalizer.
+
+        Args:
+            schema: Loaded JSON schema
+            rules_path: Path to the normalization rules file
+        """
+        self.root = compile_schema(schema or {})
+        self.rules = self._load_rules(rules_path)
+
+        self.coercions = self.rules.get("typeCoercions", {})
+        self.parent_categories = self.rules.get("parentCategories", {})
+        self.string_to_object = [
+            (self._compile_path(rule["path"]), rule)
+            for rule in self.rules.get("stringToObject", [])
+        ]
+        self.item_rules = [
+            (self._compile_path(rule["path"]), rule)
+            for rule in self.rules.get("itemRules", [])
+        ]
+        # Normalized phrase -> enum values it names (more than one makes it ambiguous)
+        self.synonyms: Dict[str, set] = {}
+        for enum_value, phrases in self.rules.get("enumSynonyms", {}).items():
+            for phrase in phrases:
+                self.synonyms.setdefault(self._enum_text(phrase), set()).add(enum_value)
+        self._split_patterns: Dict[str, re.Pattern] = {}
+
+    def _load_rules(self, path: Path) -> Dict:
+        """Load normalization rules from file."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            raise Exception(f"Failed to load normalization rules from {path}: {str(e)}")
+
+    @staticmethod
+    def _compile_path(pattern: str) -> re.Pattern:
+        """Compile a rule path such as 'toolsAndEnvironment.*[]' into a regex."""
+        regex = re.escape(pattern).replace(r"\*", r"[^.\[\]]+")
+        return re.compile(f"^{regex}$")
+
+    def normalize(self, data: Dict) -> Tuple[Dict, List[Dict]]:
+        """
+        Normalize extracted data in place.
+
+        Args:
+            data: Extracted service data
+
+        Returns:
+            Tuple of (normalized data, list of applied changes)
+        """
+        changes: List[Dict] = []
+        if not isinstance(data, dict):
+            return data, changes
+        return self._visit(data, self.root, "", "", None, changes), changes
+
+    def _visit(self, value, node: Optional[SchemaNode], path: str, pattern: str,
+               parent_key: Optional[str], changes: List[Dict]):
+        """Normalize one value and recurse into its children."""
+        if node is not None:
+            value = self._coerce(value, node, path, pattern, changes)
+            value = self._map_enum(value, node, path, changes)
+
+        if isinstance(value, dict):
+            for key in list(value.keys()):
+                child = None
+                if node is not None:
+                    child = node.properties.get(key, node.additional)
+                child_path = f"{path}.{key}" if path else key
+                child_pattern = f"{pattern}.{key}" if pattern else key
+                value[key] = self._visit(value[key], child, child_path, child_pattern, key, changes)
+
+        elif isinstance(value, list):
+            item_node = node.items if node is not None else None
+            item_pattern = f"{pattern}[]"
+            value = self._apply_item_rules(value, item_pattern, path, parent_key, changes)
+            for i, item in enumerate(value):
+                value[i] = self._visit(item, item_node, f"{path}[{i}]", item_pattern, parent_key, changes)
+
+        return value
+
+    def _coerce(self, value, node: SchemaNode, path: str, pattern: str, changes: List[Dict]):
+        """Coerce a value to the type expected by the schema."""
+        actual = json_type(value)
+        if actual == "null" or node.accepts_type(actual):
+            return value
+
+        for expected in node.types:
+            review = []
+            if expected == "object" and actual == "string":
+                converted, review = self._string_to_object(value, pattern)
+            else:
+                rule = self.coercions.get(f"{actual}->{expected}")
+                converted = self._apply_coercion(rule, value, expected) if rule else None
+
+            if converted is not None:
+                change = {
+                    'path': path,
+                    'rule': f"{actual}->{expected}",
+                    'before': str(value)[:100],
+                    'after': str(converted)[:100]
+                }
+                if review:
+                    change['review'] = review
+                changes.append(change)
+                return converted
+
+        return value
+
+    def _apply_coercion(self, rule: Dict, value, expected: str):
+        """Apply a single type coercion rule. Returns None if not applicable."""
+        action = rule.get("action")
+
+        if action == "toString":
+            if isinstance(value, bool):
+                return "true" if value else "false"
+            if isinstance(value, float) and value.is_integer():
+                return str(int(value))
+            return str(value)
+
+        if action == "splitString":
+            pattern = rule.get("pattern", ";")
+            if pattern not in self._split_patterns:
+                self._split_patterns[pattern] = re.compile(pattern)
+            parts = [p.strip() for p in self._split_patterns[pattern].split(value)]
+            return [p for p in parts if p]
+
+        if action == "joinArray":
+            if any(isinstance(v, (dict, list)) for v in value):
+                return None
+            return rule.get("separator", "; ").join(str(v) for v in value if v is not None)
+
+        if action == "parseNumber":
+            text = str(value).strip().replace(",", "") if isinstance(value, str) else value
+            try:
+                number = float(text)
+            except (TypeError, ValueError):
+                return None
+            if expected == "integer":
+                return int(number) if number.is_integer() else None
+            return int(number) if isinstance(text, str) and re.fullmatch(r"-?\d+", text) else number
+
+        if action == "parseBoolean":
+            text = value.strip().lower()
+            if text in rule.get("true", []):
+                return True
+            if text in rule.get("false", []):
+                return False
+            return None
+
+        if action == "wrapInArray":
+            return [value]
+
+        return None
+
+    def _string_to_object(self, value: str, pattern: str) -> Tuple[Optional[Dict], List[str]]:
+        """
+        Expand a plain string into an object using a path template.
+
+        Returns:
+            Tuple of (object or None, fields left unset for manual review)
+        """
+        for regex, rule in self.string_to_object:
+            if regex.match(pattern):
+                return self._render(rule["template"], {"value": value}), list(rule.get("review", []))
+        return None, []
+
+    @staticmethod
+    def _enum_text(text: str) -> str:
+        """Normalize text for enum matching: 'As-Needed.' -> 'as needed'"""
+        return " ".join(re.sub(r"[\s_\-]+", " ", text).strip(" .,;:!").lower().split())
+
+    def _map_enum(self, value, node: SchemaNode, path: str, changes: List[Dict]):
+        """
+        Map descriptive text onto an allowed enum value.
+
+        Only the enum value itself or a listed synonym phrase (the whole text)
+        is mapped. Anything else ("May be required for sign-off") is left
+        unchanged and reported for review instead of guessing.
+        """
+        if not node.enum or not isinstance(value, str) or value in node.enum:
+            return value
+
+        allowed = [e for e in node.enum if isinstance(e, str)]
+        text = self._enum_text(value)
+        candidates = {e for e in allowed if self._enum_text(e) == text}
+        if not candidates:
+            candidates = self.synonyms.get(text, set()) & set(allowed)
+
+        change = {'path': path, 'rule': 'enum', 'before': value[:100]}
+        if len(candidates) == 1:
+            change['after'] = candidates.pop()
+            changes.append(change)
+            return change['after']
+
+        change['after'] = UNCHANGED
+        change['review'] = [re.sub(r"\[\d+\]", "", path).rsplit(".", 1)[-1]]
+        changes.append(change)
+        return value
+
+    def _apply_item_rules(self, items: List, pattern: str, path: str,
+                          parent_key: Optional[str], changes: List[Dict]) -> List:
+        """Expand or restructure array items according to item rules."""
+        rules = [rule for regex, rule in self.item_rules if regex.match(pattern)]
+        if not rules:
+            return items
+
+        result = []
+        for i, item in enumerate(items):
+            rule = next((r for r in rules if self._matches(r.get("when", {}), item)), None)
+            if rule is None:
+                result.append(item)
+                continue
+
+            emitted = self._expand_item(rule, item, parent_key)
+            result.extend(emitted)
+            changes.append({
+                'path': f"{path}[{i}]",
+                'rule': rule.get("name", "itemRule"),
+                'before': str(item)[:100],
+                'after': f"{len(emitted)} item(s)"
+            })
+
+        return result
+
+    @staticmethod
+    def _matches(condition: Dict, item) -> bool:
+        """Check whether an item satisfies a rule's 'when' condition."""
+        if "type" in condition and json_type(item) != condition["type"]:
+            return False
+        if not isinstance(item, dict):
+            return "hasKey" not in condition and "anyKey" not in condition
+        if "hasKey" in condition and condition["hasKey"] not in item:
+            return False
+        if "missingKey" in condition and condition["missingKey"] in item:
+            return False
+        if "anyKey" in condition and not any(k in item for k in condition["anyKey"]):
+            return False
+        return True
+
+    def _expand_item(self, rule: Dict, item, parent_key: Optional[str]) -> List:
+        """Render a rule's emit templates for one matched item."""
+        context = dict(item) if isinstance(item, dict) else {"value": item}
+        context["parentCategory"] = self.parent_categories.get(parent_key, parent_key or "")
+
+        variants = [context]
+        if "splitField" in rule:
+            split = rule["splitField"]
+            raw = context.get(split["field"], "")
+            pieces = raw.split(split.get("separator", ",")) if isinstance(raw, str) else [raw]
+            variants = [dict(context, item=p.strip() if isinstance(p, str) else p)
+                        for p in pieces if p not in ("", None)]
+        elif "pivotKeys" in rule:
+            variants = [dict(context, label=label)
+                        for key, label in rule["pivotKeys"].items() if context.get(key)]
+
+        return [self._render(template, variant)
+                for variant in variants
+                for template in rule.get("emit", [])]
+
+    def _render(self, template, context: Dict):
+        """Fill '{field}' / '{field|default}' placeholders in a template."""
+        if isinstance(template, dict):
+            return {k: self._render(v, context) for k, v in template.items()}
+        if isinstance(template, list):
+            return [self._render(v, context) for v in template]
+        if not isinstance(template, str):
+            return template
+
+        def lookup(match):
+            found = context.get(match.group(1))
+            if found in (None, ""):
+                return match.group(2) or ""
+            return found
+
+        whole = _PLACEHOLDER.fullmatch(template)
+        if whole:
+            return lookup(whole)
+        return _PLACEHOLDER.sub(lambda m: str(lookup(m)), template)
+
+
+def main():
+    """Normalize existing extraction outputs without calling the API."""
+    script_dir = Path(__file__).parent
+    output_dir = script_dir / "output"
+    schema_path = script_dir.parent.parent / "schemas" / "service-import-schema.json"
+
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    dry_run = '--dry-run' in sys.argv
+    if args:
+        output_dir = Path(args[0])
+
+    if not output_dir.exists():
+        print(f"❌ Output directory not found: {output_dir}")
+        sys.exit(1)
+
+    if not schema_path.exists():
+        print(f"❌ Schema not found: {schema_path}")
+        sys.exit(1)
+
+    with open(schema_path, 'r', encoding='utf-8') as f:
+        normalizer = SchemaNormalizer(json.load(f))
+
+    json_files = sorted(output_dir.glob("*.json"))
+    print(f"🔧 Normalizing {len(json_files)} JSON file(s){' (dry run)' if dry_run else ''}...")
+    print("=" * 80)
+
+    total = 0
+    for json_file in json_files:
+        with open(json_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        data, changes = normalizer.normalize(data)
+        applied = [c for c in changes if c['after'] != UNCHANGED]
+        total += len(applied)
+        print(f"\n📄 {json_file.name}: {len(applied)} change(s)")
+        for change in changes:
+            print(f"   {change['path']} [{change['rule']}]: {change['before']} → {change['after']}")
+            if change.get('review'):
+                print(f"      👀 Review: {', '.join(change['review'])} needs manual review")
+
+        if applied and not dry_run:
+            atomic_write(json_file, json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8'))
+
+    print("\n" + "=" * 80)
+    print(f"✅ {total} change(s) {'found' if dry_run else 'applied'}")
+
+
+if __name__ == "__main__":
+    main()
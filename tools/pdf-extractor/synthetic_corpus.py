@@ -0,0 +1,298 @@
+"""
+Synthetic Extraction Corpus
+===========================
+
+Expands sample outputs into large corpora (1k, 10k, 100k documents) for
+benchmarking the analysis tools. Documents are derived from real outputs
+with varied array sizes (see load_test.py) and a share of them gets
+controlled type mismatches injected:
+
+- teamSize-integer          teamSize given as a number ("2-3 resources" -> 2)
+- responsibilities-string   responsibilities given as one string instead of a list
+- tools-string              tool entries given as plain strings instead of objects
+
+The expected findings (ground truth) are computed with the compiled import
+schema ($ref, allOf/anyOf/oneOf and type unions resolved) and stored in
+<corpus>/.corpus-manifest, keyed by path with array indices collapsed
+(sizeOptions[].teamSize) and the actual type. The manifest also records the
+generation settings (seed, rate and hashes of the templates and schema) so a
+corpus is only reused for the settings it was generated with.
+
+Usage:
+    python synthetic_corpus.py <count> <corpus_dir> [--source output/] [--schema path] [--rate 0.2] [--seed 7]
+"""
+
+import hashlib
+import json
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from common import option
+from load_test import SyntheticServiceFactory, load_templates
+from schema_normalizer import SchemaNode, compile_schema, json_type
+
+
+MANIFEST_FILE = ".corpus-manifest"
+MANIFEST_VERSION = 2
+
+_INDEX = re.compile(r"\[\d+\]")
+
+
+def canonical_path(path: str) -> str:
+    """Collapse array indices: sizeOptions[2].teamSize -> sizeOptions[].teamSize"""
+    return _INDEX.sub("[]", path)
+
+
+def _first_number(text: str) -> int:
+    match = re.search(r"\d+", text)
+    return int(match.group()) if match else 1
+
+
+def _inject_team_size(data: Dict) -> int:
+    changed = 0
+    for holder in _dicts_with_key(data, "teamSize"):
+        if isinstance(holder["teamSize"], str):
+            holder["teamSize"] = _first_number(holder["teamSize"])
+            changed += 1
+    return changed
+
+
+def _inject_responsibilities(data: Dict) -> int:
+    changed = 0
+    for holder in _dicts_with_key(data, "responsibilities"):
+        if isinstance(holder["responsibilities"], list):
+            holder["responsibilities"] = "; ".join(str(r) for r in holder["responsibilities"])
+            changed += 1
+    return changed
+
+
+def _inject_tool_strings(data: Dict) -> int:
+    changed = 0
+    tools = data.get("toolsAndEnvironment")
+    if not isinstance(tools, dict):
+        return 0
+    for key, entries in tools.items():
+        if not isinstance(entries, list):
+            continue
+        for i, entry in enumerate(entries):
+            if isinstance(entry, dict):
+                entries[i] = ": ".join(str(v) for v in entry.values() if v not in (None, ""))
+                changed += 1
+    return changed
+
+
+INJECTIONS = {
+    "teamSize-integer": _inject_team_size,
+    "responsibilities-string": _inject_responsibilities,
+    "tools-string": _inject_tool_strings,
+}
+
+
+def _dicts_with_key(value, key: str) -> List[Dict]:
+    found = []
+    stack = [value]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            if key in current:
+                found.append(current)
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+    return found
+
+
+def find_type_mismatches(data, node: Optional[SchemaNode], path: str = "") -> List[tuple]:
+    """
+    Reference type check used as ground truth.
+
+    Returns:
+        List of (canonical path, expected types, actual type)
+    """
+    mismatches = []
+    stack = [(data, node, path)]
+    while stack:
+        value, current, current_path = stack.pop()
+        if current is None:
+            continue
+        actual = json_type(value)
+        if current_path and not current.accepts_type(actual):
+            mismatches.append((canonical_path(current_path), "/".join(current.types), actual))
+            continue
+        if isinstance(value, dict):
+            for key, child in value.items():
+                child_node = current.properties.get(key, current.additional)
+                stack.append((child, child_node, f"{current_path}.{key}" if current_path else key))
+        elif isinstance(value, list):
+            for i, child in enumerate(value):
+                stack.append((child, current.items, f"{current_path}[{i}]"))
+    return mismatches
+
+
+def content_hash(value) -> str:
+    """Stable hash of a JSON value (key order does not matter)."""
+    data = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def truth_key(path: str, actual: str) -> str:
+    """Key of an expected finding in the manifest."""
+    return f"{path}:{actual}"
+
+
+class CorpusGenerator:
+    """Writes a synthetic corpus and its ground truth."""
+
+    def __init__(self, templates: List[Dict], schema: Dict, rate: float = 0.2, seed: int = 7):
+        """
+        Initialize the generator.
+
+        Args:
+            templates: Extracted outputs to derive documents from
+            schema: Import schema used to compute the expected findings
+            rate: Share of documents that get mismatches injected
+            seed: Random seed; a corpus is a prefix of any larger corpus with the same seed
+        """
+        self.factory = SyntheticServiceFactory(templates, seed=seed)
+        self.root = compile_schema(schema)
+        self.rate = rate
+        self.seed = seed
+        self.settings = {
+            "seed": seed,
+            "rate": rate,
+            "sourceHash": content_hash(templates),
+            "schemaHash": content_hash(schema)
+        }
+        self.rng = random.Random(seed + 1)
+
+    def matches(self, manifest: Optional[Dict], count: int) -> bool:
+        """True if the manifest describes a corpus of `count` documents generated with these settings."""
+        if not manifest or manifest.get("documents") != count:
+            return False
+        return all(manifest.get(key) == value for key, value in self.settings.items())
+
+    def generate(self, count: int, corpus_dir: Path) -> Dict:
+        """
+        Write `count` documents to corpus_dir.
+
+        Returns:
+            The manifest (also written to corpus_dir/.corpus-manifest)
+        """
+        corpus_dir = Path(corpus_dir)
+        corpus_dir.mkdir(parents=True, exist_ok=True)
+        for stale in corpus_dir.glob("doc-*.json"):
+            stale.unlink()
+
+        truth = defaultdict(int)
+        expected_types = {}
+        injected = defaultdict(int)
+        injected_documents = 0
+        total_bytes = 0
+        width = len(str(count))
+
+        for number in range(count):
+            # Codes only need to look valid here; they repeat after ID999
+            document = self.factory.create(number, f"ID{number % 1000:03d}")
+
+            if self.rng.random() < self.rate:
+                kinds = self.rng.sample(sorted(INJECTIONS), self.rng.randint(1, len(INJECTIONS)))
+                changed = 0
+                for kind in kinds:
+                    applied = INJECTIONS[kind](document)
+                    injected[kind] += applied
+                    changed += applied
+                if changed:
+                    injected_documents += 1
+
+            for path, expected, actual in find_type_mismatches(document, self.root):
+                truth[truth_key(path, actual)] += 1
+                expected_types[truth_key(path, actual)] = expected
+
+            data = json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+            (corpus_dir / f"doc-{number:0{width}d}.json").write_bytes(data)
+            total_bytes += len(data)
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "documents": count,
+            **self.settings,
+            "bytes": total_bytes,
+            "injectedDocuments": injected_documents,
+            "injected": dict(injected),
+            "truth": dict(truth),
+            "expectedTypes": expected_types
+        }
+        with open(corpus_dir / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+
+def load_manifest(corpus_dir: Path) -> Optional[Dict]:
+    """Manifest of an existing corpus (None if missing or from another version)."""
+    path = Path(corpus_dir) / MANIFEST_FILE
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except ValueError:
+        return None
+    return manifest if manifest.get("version") == MANIFEST_VERSION else None
+
+
+def main():
+    """Main execution."""
+    script_dir = Path(__file__).parent
+    schema_path = Path(option('--schema', str(script_dir.parent.parent / "schemas" / "service-import-schema.json")))
+    source = Path(option('--source', str(script_dir / "output")))
+
+    args = []
+    tokens = iter(sys.argv[1:])
+    for token in tokens:
+        if token.startswith('--'):
+            next(tokens, None)  # skip the option's value
+        else:
+            args.append(token)
+    if len(args) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    count = int(args[0])
+    corpus_dir = Path(args[1])
+
+    if not schema_path.exists():
+        print(f"❌ Schema not found: {schema_path}")
+        sys.exit(1)
+    templates = load_templates(source) if source.exists() else []
+    if not templates:
+        print(f"❌ No extracted outputs found in {source}")
+        sys.exit(1)
+
+    with open(schema_path, 'r', encoding='utf-8') as f:
+        schema = json.load(f)
+
+    generator = CorpusGenerator(templates, schema, rate=float(option('--rate', "0.2")),
+                                seed=int(option('--seed', "7")))
+    print(f"🏭 Generating {count} document(s) from {len(templates)} template(s) into {corpus_dir}")
+    start = time.perf_counter()
+    manifest = generator.generate(count, corpus_dir)
+    elapsed = time.perf_counter() - start
+
+    print("=" * 80)
+    print(f"📄 Documents: {manifest['documents']} ({manifest['bytes'] / 1024 / 1024:.1f} MB) in {elapsed:.1f}s")
+    print(f"💉 Documents with injected mismatches: {manifest['injectedDocuments']}")
+    for kind, values in sorted(manifest["injected"].items()):
+        print(f"   {kind}: {values} value(s)")
+    print(f"🎯 Expected findings: {sum(manifest['truth'].values())} in {len(manifest['truth'])} pattern(s)")
+    for key, n in sorted(manifest["truth"].items(), key=lambda item: -item[1])[:10]:
+        print(f"   {n:>8}  {key}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
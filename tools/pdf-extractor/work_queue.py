@@ -0,0 +1,675 @@
+"""
+Shared Extraction Work Queue
+============================
+
+Lets several extract_services.py workers on different machines share one
+extraction run. PDFs are claimed through leases that expire: a worker
+renews its lease while extracting, so when a worker crashes (or its
+machine goes away) the lease runs out and another worker picks the PDF
+up again. Results are written to one shared output directory.
+
+Two backends share the same interface:
+- SQLite database on a shared volume (queue location ending in .db/.sqlite)
+- Lock files in a shared directory (any other location), for filesystems
+  where SQLite locking is unreliable
+
+Lease expiry compares wall-clock times across machines, so worker clocks
+must be roughly in sync (NTP); keep the lease well above the clock skew.
+
+Usage:
+    python work_queue.py status <queue>
+    python work_queue.py requeue <queue>
+    python work_queue.py simulate [--workers 4] [--tasks 40] [--backend sqlite|lockfile] [--crash 1] [--stall 0]
+
+simulate drives the real extract_services.run_queue_worker loop with a
+stand-in extractor, so it needs the extractor's dependencies installed.
+"""
+
+import json
+import os
+import random
+import shutil
+import signal
+import socket
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from common import atomic_write, option
+
+
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 3
+
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+def worker_id() -> str:
+    """Identify this worker process across machines."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue(ABC):
+    """
+    Interface of the shared queue backends.
+
+    A lease is a dictionary with 'task', 'worker', 'expires' and 'attempt'.
+    Every call that finishes a task only takes effect while the lease still
+    belongs to its worker, and reports whether it did.
+    """
+
+    def __init__(self, lease_seconds: int = DEFAULT_LEASE_SECONDS, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        """
+        Initialize the queue.
+
+        Args:
+            lease_seconds: How long a claim is valid without renewal
+            max_attempts: Claims per task before it is marked failed
+        """
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    @abstractmethod
+    def enqueue(self, tasks: List[str]) -> int:
+        """Add tasks that are not known yet. Returns the number added."""
+
+    @abstractmethod
+    def claim(self, worker: str) -> Optional[Dict]:
+        """Lease the next queued (or expired) task, None if nothing is claimable."""
+
+    @abstractmethod
+    def renew(self, lease: Dict) -> bool:
+        """Extend a lease. Returns False if the lease was lost to another worker."""
+
+    @abstractmethod
+    def complete(self, lease: Dict, outputs: List[str] = None) -> bool:
+        """Mark a leased task done. Returns False if the lease was lost."""
+
+    @abstractmethod
+    def fail(self, lease: Dict, error: str = "") -> bool:
+        """Give a task back; it is queued again until max_attempts is reached. False if the lease was lost."""
+
+    @abstractmethod
+    def release(self, lease: Dict) -> bool:
+        """Give a task back without counting the attempt (graceful shutdown). False if the lease was lost."""
+
+    @abstractmethod
+    def requeue_failed(self) -> int:
+        """Queue failed tasks again with a fresh attempt budget."""
+
+    @abstractmethod
+    def tasks(self) -> Dict[str, Dict]:
+        """State of every task, keyed by task name."""
+
+    def counts(self) -> Dict[str, int]:
+        """Number of tasks per state; expired leases count as queued."""
+        now = time.time()
+        counts = {QUEUED: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        for task in self.tasks().values():
+            state = task["state"]
+            if state == LEASED and task["expires"] < now:
+                state = QUEUED
+            counts[state] += 1
+        return counts
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteWorkQueue(WorkQueue):
+    """Queue in a SQLite database; claims are serialized by an immediate transaction."""
+
+    def __init__(self, db_path: Path, **options):
+        super().__init__(**options)
+        self.db_path = self.location = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Rollback journal (the default), not WAL: WAL needs shared memory and breaks on network volumes
+        self.conn = sqlite3.connect(str(self.db_path), timeout=60, isolation_level=None)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                name TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                worker TEXT,
+                expires REAL NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                outputs TEXT,
+                updated REAL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, expires)")
+
+    def enqueue(self, tasks: List[str]) -> int:
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO tasks (name, state, updated) VALUES (?, ?, ?)",
+                [(name, QUEUED, now) for name in tasks])
+            added = self.conn.total_changes - before
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return added
+
+    def claim(self, worker: str) -> Optional[Dict]:
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Tasks whose lease ran out without being completed were held by a crashed worker
+            expired = self.conn.execute(
+                "SELECT name FROM tasks WHERE state = ? AND expires < ? AND attempts >= ?",
+                (LEASED, now, self.max_attempts)).fetchall()
+            for (name,) in expired:
+                self.conn.execute(
+                    "UPDATE tasks SET state = ?, error = ?, updated = ? WHERE name = ?",
+                    (FAILED, "lease expired on last attempt", now, name))
+
+            row = self.conn.execute(
+                "SELECT name, attempts FROM tasks WHERE state = ? OR (state = ? AND expires < ?) "
+                "ORDER BY attempts, name LIMIT 1",
+                (QUEUED, LEASED, now)).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+
+            name, attempts = row
+            expires = now + self.lease_seconds
+            self.conn.execute(
+                "UPDATE tasks SET state = ?, worker = ?, expires = ?, attempts = ?, updated = ? WHERE name = ?",
+                (LEASED, worker, expires, attempts + 1, now, name))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return {"task": name, "worker": worker, "expires": expires, "attempt": attempts + 1}
+
+    def renew(self, lease: Dict) -> bool:
+        expires = time.time() + self.lease_seconds
+        cursor = self.conn.execute(
+            "UPDATE tasks SET expires = ? WHERE name = ? AND worker = ? AND state = ?",
+            (expires, lease["task"], lease["worker"], LEASED))
+        if cursor.rowcount:
+            lease["expires"] = expires
+        return cursor.rowcount > 0
+
+    def complete(self, lease: Dict, outputs: List[str] = None) -> bool:
+        cursor = self.conn.execute(
+            "UPDATE tasks SET state = ?, error = NULL, outputs = ?, updated = ? "
+            "WHERE name = ? AND worker = ? AND state = ?",
+            (DONE, json.dumps(outputs or []), time.time(), lease["task"], lease["worker"], LEASED))
+        return cursor.rowcount > 0
+
+    def fail(self, lease: Dict, error: str = "") -> bool:
+        state = FAILED if lease["attempt"] >= self.max_attempts else QUEUED
+        cursor = self.conn.execute(
+            "UPDATE tasks SET state = ?, expires = 0, error = ?, updated = ? "
+            "WHERE name = ? AND worker = ? AND state = ?",
+            (state, error[:500], time.time(), lease["task"], lease["worker"], LEASED))
+        return cursor.rowcount > 0
+
+    def release(self, lease: Dict) -> bool:
+        cursor = self.conn.execute(
+            "UPDATE tasks SET state = ?, expires = 0, attempts = MAX(attempts - 1, 0), updated = ? "
+            "WHERE name = ? AND worker = ? AND state = ?",
+            (QUEUED, time.time(), lease["task"], lease["worker"], LEASED))
+        return cursor.rowcount > 0
+
+    def requeue_failed(self) -> int:
+        cursor = self.conn.execute(
+            "UPDATE tasks SET state = ?, attempts = 0, expires = 0, updated = ? WHERE state = ?",
+            (QUEUED, time.time(), FAILED))
+        return cursor.rowcount
+
+    def tasks(self) -> Dict[str, Dict]:
+        rows = self.conn.execute("SELECT name, state, worker, expires, attempts, error FROM tasks")
+        return {name: {"state": state, "worker": worker, "expires": expires, "attempts": attempts, "error": error}
+                for name, state, worker, expires, attempts, error in rows}
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class LockFileWorkQueue(WorkQueue):
+    """
+    Queue as files in a shared directory. Only atomic create (O_EXCL) and
+    rename are relied on, which also hold on network filesystems.
+
+    <task>.task   queued task           <task>.lease  current claim
+    <task>.done   completed task        <task>.failed attempts exhausted
+    """
+
+    def __init__(self, directory: Path, **options):
+        super().__init__(**options)
+        self.directory = self.location = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, task: str, suffix: str) -> Path:
+        return self.directory / f"{task}.{suffix}"
+
+    def _read(self, path: Path) -> Optional[Dict]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def enqueue(self, tasks: List[str]) -> int:
+        added = 0
+        for task in tasks:
+            try:
+                fd = os.open(self._path(task, "task"), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                continue
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"attempts": 0}, f)
+            added += 1
+        return added
+
+    def claim(self, worker: str) -> Optional[Dict]:
+        names = sorted(p.name[:-len(".task")] for p in self.directory.glob("*.task"))
+        random.shuffle(names)  # spread concurrent workers over the queue instead of racing for one file
+        now = time.time()
+
+        for task in names:
+            if self._path(task, "done").exists() or self._path(task, "failed").exists():
+                continue
+
+            lease_path = self._path(task, "lease")
+            if lease_path.exists():
+                if not self._expired(lease_path, now):
+                    continue
+                # Expired lease: only one worker can win the rename of the stale lease file
+                stale = self.directory / f".{task}.{uuid.uuid4().hex}.stale"
+                try:
+                    os.rename(lease_path, stale)
+                except FileNotFoundError:
+                    continue
+                if not self._expired(stale, now):
+                    # Its owner renewed it in place between our check and the rename
+                    self._restore(stale, lease_path)
+                    continue
+                stale.unlink()
+
+            lease = self._create_lease(task, worker, now)
+            if lease is not None:
+                return lease
+        return None
+
+    def _expired(self, lease_path: Path, now: float) -> bool:
+        current = self._read(lease_path)
+        if current is not None:
+            return current["expires"] < now
+        # Empty lease file: being written right now, or its worker died in between
+        try:
+            return lease_path.stat().st_mtime < now - self.lease_seconds
+        except FileNotFoundError:
+            return False
+
+    def _create_lease(self, task: str, worker: str, now: float) -> Optional[Dict]:
+        try:
+            fd = os.open(self._path(task, "lease"), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return None
+
+        # The lease file is ours now, so the attempt counter can be updated safely
+        record = self._read(self._path(task, "task")) or {"attempts": 0}
+        if record["attempts"] >= self.max_attempts:
+            os.close(fd)
+            atomic_write(self._path(task, "failed"), json.dumps(
+                {"attempts": record["attempts"], "error": "lease expired on last attempt"}).encode('utf-8'))
+            self._path(task, "lease").unlink()
+            return None
+
+        lease = {"task": task, "worker": worker, "expires": now + self.lease_seconds,
+                 "attempt": record["attempts"] + 1}
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(lease, f)
+        atomic_write(self._path(task, "task"), json.dumps({"attempts": lease["attempt"]}).encode('utf-8'))
+        return lease
+
+    def _restore(self, taken: Path, lease_path: Path) -> None:
+        """Put back a lease file taken by mistake, unless a new lease was created meanwhile."""
+        try:
+            os.link(taken, lease_path)
+        except FileExistsError:
+            pass
+        taken.unlink()
+
+    def renew(self, lease: Dict) -> bool:
+        # Updated in place, never replaced: a lease file another worker has
+        # just created can not be overwritten by a stale owner
+        lease_path = self._path(lease["task"], "lease")
+        try:
+            fd = os.open(lease_path, os.O_RDWR)
+        except FileNotFoundError:
+            return False
+        with os.fdopen(fd, 'r+', encoding='utf-8') as f:
+            try:
+                current = json.load(f)
+            except ValueError:
+                return False  # a new owner is writing its lease
+            if current.get("worker") != lease["worker"]:
+                return False
+            expires = time.time() + self.lease_seconds
+            f.seek(0)
+            f.truncate()
+            json.dump({**lease, "expires": expires}, f)
+            f.flush()
+            os.fsync(f.fileno())
+            # If the file was stolen (renamed away) meanwhile, the update went to the stale copy
+            try:
+                live = os.stat(lease_path).st_ino == os.fstat(f.fileno()).st_ino
+            except FileNotFoundError:
+                live = False
+        if live:
+            lease["expires"] = expires
+        return live
+
+    def _drop_lease(self, lease: Dict) -> None:
+        lease_path = self._path(lease["task"], "lease")
+        taken = self.directory / f".{lease['task']}.{uuid.uuid4().hex}.drop"
+        try:
+            os.rename(lease_path, taken)
+        except FileNotFoundError:
+            return
+        current = self._read(taken)
+        if current is not None and current.get("worker") == lease["worker"]:
+            taken.unlink()
+        else:
+            self._restore(taken, lease_path)
+
+    def complete(self, lease: Dict, outputs: List[str] = None) -> bool:
+        # Renewing first proves ownership and keeps the lease from expiring until it is dropped
+        if not self.renew(lease):
+            return False
+        record = {"worker": lease["worker"], "attempt": lease["attempt"], "outputs": outputs or []}
+        atomic_write(self._path(lease["task"], "done"), json.dumps(record).encode('utf-8'))
+        self._drop_lease(lease)
+        return True
+
+    def fail(self, lease: Dict, error: str = "") -> bool:
+        if not self.renew(lease):
+            return False
+        if lease["attempt"] >= self.max_attempts:
+            record = {"attempts": lease["attempt"], "error": error[:500]}
+            atomic_write(self._path(lease["task"], "failed"), json.dumps(record).encode('utf-8'))
+        self._drop_lease(lease)
+        return True
+
+    def release(self, lease: Dict) -> bool:
+        if not self.renew(lease):
+            return False
+        atomic_write(self._path(lease["task"], "task"),
+                     json.dumps({"attempts": max(lease["attempt"] - 1, 0)}).encode('utf-8'))
+        self._drop_lease(lease)
+        return True
+
+    def requeue_failed(self) -> int:
+        failed = list(self.directory.glob("*.failed"))
+        for path in failed:
+            task = path.name[:-len(".failed")]
+            atomic_write(self._path(task, "task"), json.dumps({"attempts": 0}).encode('utf-8'))
+            path.unlink()
+        return len(failed)
+
+    def tasks(self) -> Dict[str, Dict]:
+        result = {}
+        for path in self.directory.glob("*.task"):
+            task = path.name[:-len(".task")]
+            record = self._read(path) or {"attempts": 0}
+            entry = {"state": QUEUED, "worker": None, "expires": 0, "attempts": record["attempts"], "error": None}
+            done = self._read(self._path(task, "done"))
+            failed = self._read(self._path(task, "failed"))
+            lease = self._read(self._path(task, "lease"))
+            if done is not None:
+                entry.update(state=DONE, worker=done.get("worker"))
+            elif failed is not None:
+                entry.update(state=FAILED, error=failed.get("error"))
+            elif lease is not None:
+                entry.update(state=LEASED, worker=lease["worker"], expires=lease["expires"])
+            result[task] = entry
+        return result
+
+
+def open_queue(location: Path, **options) -> WorkQueue:
+    """
+    Open a shared queue.
+
+    Args:
+        location: SQLite file (.db/.sqlite) or directory for the lock-file backend
+        **options: lease_seconds, max_attempts
+
+    Returns:
+        WorkQueue backend for the location
+    """
+    location = Path(location)
+    if location.suffix in (".db", ".sqlite", ".sqlite3"):
+        return SqliteWorkQueue(location, **options)
+    return LockFileWorkQueue(location, **options)
+
+
+class LeaseKeeper:
+    """Renews a lease in the background while the task is being worked on."""
+
+    def __init__(self, queue: WorkQueue, lease: Dict):
+        self.queue = queue
+        self.lease = lease
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def _run(self) -> None:
+        # The thread opens its own backend: SQLite connections are bound to their thread
+        queue = open_queue(self.queue.location, lease_seconds=self.queue.lease_seconds,
+                           max_attempts=self.queue.max_attempts)
+        try:
+            while not self._stop.wait(self.queue.lease_seconds / 3):
+                if not queue.renew(self.lease):
+                    self.lost = True
+                    print(f"⚠️  Lease on {self.lease['task']} was lost to another worker")
+                    return
+        finally:
+            queue.close()
+
+
+def print_status(queue: WorkQueue) -> None:
+    """Print task counts, active leases and failures."""
+    counts = queue.counts()
+    print(f"📋 Tasks: {sum(counts.values())}  queued {counts[QUEUED]}  leased {counts[LEASED]}  "
+          f"done {counts[DONE]}  failed {counts[FAILED]}")
+    now = time.time()
+    for name, task in sorted(queue.tasks().items()):
+        if task["state"] == LEASED and task["expires"] >= now:
+            print(f"   🔒 {name}  {task['worker']}  (lease {task['expires'] - now:.0f}s left, attempt {task['attempts']})")
+        elif task["state"] == FAILED:
+            print(f"   ❌ {name}  {task['error'] or ''}")
+
+
+class _SimulatedExtractor:
+    """Stands in for ServicePdfExtractor: 'extracts' by sleeping, optionally dies mid-extraction."""
+
+    def __init__(self, crash: bool):
+        self.crash = crash
+
+    def extract_from_pdf(self, pdf_path: str) -> Dict:
+        time.sleep(random.uniform(0.05, 0.3))
+        if self.crash:
+            os._exit(1)  # die holding the lease, like a node that lost power
+        return {"serviceCode": Path(pdf_path).stem, "worker": worker_id()}
+
+
+def _simulated_worker(location: str, pdf_dir: str, out_dir: str, lease_seconds: float, crash: bool) -> None:
+    """One simulated node running the real extract_services.run_queue_worker loop."""
+    # Imported here: extract_services imports this module and needs the extractor's dependencies
+    from extract_services import run_queue_worker
+    from run_journal import GracefulInterrupt
+
+    sys.stdout = open(os.devnull, 'w', encoding='utf-8')
+    queue = open_queue(Path(location), lease_seconds=lease_seconds)
+
+    # Log successful completions so the parent can detect a task completed twice
+    complete = queue.complete
+
+    def logged_complete(lease: Dict, outputs: List[str] = None) -> bool:
+        completed = complete(lease, outputs)
+        if completed:
+            with open(Path(out_dir) / "completions.log", 'a', encoding='utf-8') as f:
+                f.write(f"{lease['task']}\t{lease['worker']}\n")
+        return completed
+
+    queue.complete = logged_complete
+    with GracefulInterrupt() as interrupt:
+        run_queue_worker(queue, _SimulatedExtractor(crash), Path(pdf_dir), Path(out_dir), interrupt,
+                         split_catalogues=False)
+    queue.close()
+
+
+def simulate(workers: int, tasks: int, backend: str, crashes: int, stalls: int = 0) -> bool:
+    """
+    Run several worker processes against one queue on a local temp directory.
+
+    Crashing workers die while holding a lease. Stalled workers are paused
+    (SIGSTOP) past their lease and resumed once others took their task over;
+    they must not complete it as well.
+
+    Returns:
+        True if every task was completed exactly once and has one output
+    """
+    import multiprocessing
+
+    if stalls and not hasattr(signal, "SIGSTOP"):
+        print("ℹ️  --stall needs SIGSTOP; not available on this platform")
+        stalls = 0
+
+    root = Path(tempfile.mkdtemp(prefix="work-queue-sim-"))
+    location = root / ("queue.db" if backend == "sqlite" else "queue")
+    pdf_dir = root / "pdfs"
+    out_dir = root / "output"
+    pdf_dir.mkdir()
+    out_dir.mkdir()
+    lease_seconds = 1.5
+
+    queue = open_queue(location, lease_seconds=lease_seconds)
+    names = [f"catalogue-{i:04d}.pdf" for i in range(tasks)]
+    for name in names:
+        (pdf_dir / name).write_bytes(b"%PDF-1.4\n")
+    queue.enqueue(names)
+    queue.enqueue(names)  # every node enqueues what it sees; duplicates are ignored
+
+    print(f"🧪 Simulating {workers} worker(s), {tasks} task(s), backend {backend}, "
+          f"{crashes} crashing and {stalls} stalled worker(s)")
+    print(f"   Shared directory: {root}")
+    start = time.time()
+    processes = [
+        multiprocessing.Process(target=_simulated_worker,
+                                args=(str(location), str(pdf_dir), str(out_dir), lease_seconds, i < crashes))
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    stalled = processes[crashes:crashes + stalls]
+    if stalled:
+        time.sleep(0.5)
+        for process in stalled:
+            os.kill(process.pid, signal.SIGSTOP)
+        # Resume them only once other workers took over every lease they held
+        stalled_ids = {f"{socket.gethostname()}:{p.pid}" for p in stalled}
+        deadline = time.time() + 120
+        time.sleep(lease_seconds * 2)
+        while time.time() < deadline and any(
+                task["state"] == LEASED and task["worker"] in stalled_ids for task in queue.tasks().values()):
+            time.sleep(0.2)
+        for process in stalled:
+            os.kill(process.pid, signal.SIGCONT)
+
+    for process in processes:
+        process.join()
+    elapsed = time.time() - start
+
+    counts = queue.counts()
+    task_states = queue.tasks()
+    queue.close()
+
+    outputs = {p.stem for p in out_dir.glob("*.json")}
+    completions = (out_dir / "completions.log").read_text(encoding='utf-8').splitlines() \
+        if (out_dir / "completions.log").exists() else []
+    per_task = {}
+    for line in completions:
+        name = line.split("\t")[0]
+        per_task[name] = per_task.get(name, 0) + 1
+    duplicated = sorted(name for name, n in per_task.items() if n > 1)
+    crashed = [p.pid for p in processes if p.exitcode != 0]
+    reclaimed = [name for name, task in task_states.items() if task["attempts"] > 1]
+
+    print("=" * 80)
+    print(f"⏱️  {elapsed:.1f}s")
+    print(f"💥 Crashed workers: {len(crashed)}  ⏸️  Stalled workers: {len(stalled)}")
+    print(f"♻️  Tasks reclaimed after lease expiry: {len(reclaimed)}")
+    print(f"📋 done {counts[DONE]}  failed {counts[FAILED]}  queued {counts[QUEUED]}  leased {counts[LEASED]}")
+    print(f"📁 Outputs: {len(outputs)}/{tasks}  completions: {len(completions)}  duplicate completions: {len(duplicated)}")
+    print("=" * 80)
+
+    ok = (counts[DONE] == tasks and len(outputs) == tasks and len(completions) == tasks
+          and not duplicated and len(crashed) == crashes)
+    shutil.rmtree(root, ignore_errors=True)
+    print("✅ Simulation passed" if ok else "❌ Simulation failed")
+    return ok
+
+
+def main():
+    """Main execution."""
+    if len(sys.argv) < 2 or sys.argv[1] not in ("status", "requeue", "simulate"):
+        print(__doc__)
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == "simulate":
+        ok = simulate(
+            workers=int(option("--workers", "4")),
+            tasks=int(option("--tasks", "40")),
+            backend=option("--backend", "sqlite"),
+            crashes=int(option("--crash", "1")),
+            stalls=int(option("--stall", "0"))
+        )
+        sys.exit(0 if ok else 1)
+
+    if len(sys.argv) < 3:
+        print(f"❌ Usage: python work_queue.py {command} <queue>")
+        sys.exit(1)
+
+    location = Path(sys.argv[2])
+    if not location.exists():
+        print(f"❌ Queue not found: {location}")
+        sys.exit(1)
+
+    queue = open_queue(location)
+    if command == "requeue":
+        print(f"♻️  Requeued {queue.requeue_failed()} failed task(s)")
+    print_status(queue)
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()